@@ -0,0 +1,251 @@
+from main import SOLITARIOS, crear_solitario
+from mesa import *
+from mazo import crear_mazo
+from simulador import jugar_partida
+
+import io, sys, json, time, random, argparse, platform, contextlib
+
+# Semilla fija de la que salen todos los datos de los benchmarks.
+SEMILLA = 1234
+
+# Cantidad de veces que se corre cada benchmark; se informa la más rápida.
+REPETICIONES = 5
+
+# Caída relativa de rendimiento respecto de la base que se considera una
+# regresión.
+UMBRAL = 0.10
+
+# Cantidad de partidas al azar que se juegan en cada benchmark de partidas y
+# cantidad máxima de jugadas de cada una.
+PARTIDAS = 20
+MAX_JUGADAS = 200
+
+
+def _bench_criterio():
+    """Comparaciones de todos los pares de cartas con cada criterio."""
+    criterios = [criterio(palo, orden) for palo in (None, MISMO_PALO, MISMO_COLOR, DISTINTO_COLOR, DISTINTO_PALO)
+                 for orden in (None, ASCENDENTE, DESCENDENTE, CONSECUTIVA)]
+    cartas = [carta_de(codigo) for codigo in range(CANT_CODIGOS)]
+
+    def correr():
+        for comp in criterios:
+            for a in cartas:
+                for b in cartas:
+                    comp(a, b)
+        return {'comparaciones': len(criterios) * len(cartas) ** 2}
+    return correr
+
+
+def _bench_apilar_desapilar():
+    """Apilar y desapilar un mazo entero en una pila con reglas."""
+    codigos = list(range(BOCA_ABAJO))
+    random.Random(SEMILLA).shuffle(codigos)
+    cartas = [carta_de(codigo) for codigo in codigos]
+    pila = PilaCartas(criterio_apilar=criterio(palo=DISTINTO_COLOR, orden=ASCENDENTE))
+
+    def correr():
+        for _ in range(100):
+            for carta in cartas:
+                pila.apilar(carta, forzar=True)
+            for _ in cartas:
+                pila.desapilar()
+        return {'operaciones': 100 * 2 * len(cartas)}
+    return correr
+
+
+def _bench_mover():
+    """Mover una escalera de 13 cartas de ida y vuelta entre dos pilas de
+    Spider."""
+    regla = criterio(orden=ASCENDENTE)
+    a = PilaCartas(criterio_apilar=regla, criterio_mover=regla)
+    b = PilaCartas(criterio_apilar=regla, criterio_mover=regla)
+    a.extender(range(12, -1, -1))
+
+    def correr():
+        for _ in range(2000):
+            b.mover(a)
+            a.mover(b)
+        return {'movidas': 4000}
+    return correr
+
+
+def _bench_crear_mazo():
+    """Crear y mezclar mazos de uno y de dos mazos."""
+    def correr():
+        azar = random.Random(SEMILLA)
+        for _ in range(200):
+            crear_mazo(azar=azar)
+            crear_mazo(mazos=2, palos=1, azar=azar)
+        return {'mazos': 400}
+    return correr
+
+
+def _bench_armar(juego):
+    """Armar mesas nuevas de juego."""
+    def correr():
+        azar = random.Random(SEMILLA)
+        for _ in range(200):
+            crear_solitario(juego, Mesa()).armar(azar)
+        return {'mesas': 200}
+    return correr
+
+
+def _bench_parsear_jugada():
+    """Parsear comandos sobre una mesa de Clasico."""
+    mesa = Mesa()
+    crear_solitario('Clasico', mesa).armar(random.Random(SEMILLA))
+    mesa.iniciar_diario()
+    comandos = ['A', 'AB', 'A1', 'M', 'N', 'NB', 'G4', 'u', 'r', 'Q', 'Z', 'AB7']
+
+    def correr():
+        for _ in range(2000):
+            for comando in comandos:
+                mesa.parsear_jugada(comando)
+        return {'comandos': 2000 * len(comandos)}
+    return correr
+
+
+def _mesas_partida(juego):
+    """Devuelve clones de las mesas por las que pasa una partida de juego al
+    azar."""
+    azar = random.Random(SEMILLA)
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(azar)
+    mesas = []
+    for _ in range(50):
+        mesas.append(mesa.clonar())
+        jugadas = solitario.jugadas_validas()
+        if not jugadas:
+            break
+        solitario.jugar(azar.choice(jugadas))
+    return mesas
+
+
+def _bench_imprimir(juego):
+    """Imprimir las mesas por las que pasa una partida de juego al azar (la
+    salida se descarta). Cada impresión es sobre un clon recién hecho, sin
+    líneas guardadas (ver Mesa.lineas), así que se mide el dibujo completo."""
+    mesas = _mesas_partida(juego)
+
+    def correr():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(20):
+                for mesa in mesas:
+                    mesa.clonar().imprimir()
+        return {'impresiones': 20 * len(mesas)}
+    return correr
+
+
+def _bench_reimprimir(juego):
+    """Imprimir una y otra vez las mesas de _bench_imprimir, que después de
+    la primera impresión salen de las líneas guardadas de cada pila."""
+    mesas = _mesas_partida(juego)
+
+    def correr():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(20):
+                for mesa in mesas:
+                    mesa.imprimir()
+        return {'impresiones': 20 * len(mesas)}
+    return correr
+
+
+def _bench_partidas(juego):
+    """Partidas de juego eligiendo jugadas al azar (ver simulador)."""
+    def correr():
+        jugadas = 0
+        for semilla in range(SEMILLA, SEMILLA + PARTIDAS):
+            jugadas += jugar_partida(juego, semilla, 'azar', MAX_JUGADAS)['jugadas']
+        return {'partidas': PARTIDAS, 'jugadas': jugadas}
+    return correr
+
+
+# Nombre de cada benchmark -> función que lo prepara y devuelve otra función
+# que lo corre una vez y devuelve un diccionario unidad -> cantidad.
+BENCHMARKS = {
+    'criterio': _bench_criterio,
+    'apilar_desapilar': _bench_apilar_desapilar,
+    'mover': _bench_mover,
+    'crear_mazo': _bench_crear_mazo,
+    'parsear_jugada': _bench_parsear_jugada,
+}
+for _juego in SOLITARIOS:
+    BENCHMARKS['armar_' + _juego] = lambda juego=_juego: _bench_armar(juego)
+    BENCHMARKS['imprimir_' + _juego] = lambda juego=_juego: _bench_imprimir(juego)
+    BENCHMARKS['reimprimir_' + _juego] = lambda juego=_juego: _bench_reimprimir(juego)
+    BENCHMARKS['partidas_' + _juego] = lambda juego=_juego: _bench_partidas(juego)
+
+
+def medir(nombres=None, repeticiones=REPETICIONES):
+    """Corre los benchmarks nombres (todos si es None), cada uno repeticiones
+    veces. Devuelve un diccionario nombre -> {unidad_por_segundo: tasa,
+    'segundos': tiempo} tomando la repetición más rápida."""
+    resultados = {}
+    for nombre in nombres or BENCHMARKS:
+        correr = BENCHMARKS[nombre]()
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            cantidades = correr()
+            segundos = time.perf_counter() - inicio
+            if mejor is None or segundos < mejor:
+                mejor = segundos
+        resultado = {unidad + '_por_segundo': cantidad / mejor for unidad, cantidad in cantidades.items()}
+        resultado['segundos'] = mejor
+        resultados[nombre] = resultado
+    return resultados
+
+
+def comparar(resultados, base, umbral=UMBRAL):
+    """Compara resultados de medir() con los de una corrida base. Devuelve la
+    lista de regresiones (nombre, medida, base, actual) de las tasas que
+    cayeron más que umbral (relativo). Los benchmarks que no están en ambos
+    se ignoran."""
+    regresiones = []
+    for nombre, resultado in resultados.items():
+        for medida, actual in resultado.items():
+            anterior = base.get(nombre, {}).get(medida)
+            if medida.endswith('_por_segundo') and anterior and actual < anterior * (1 - umbral):
+                regresiones.append((nombre, medida, anterior, actual))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de las partes críticas del motor.")
+    parser.add_argument('benchmarks', nargs='*', metavar='BENCHMARK',
+                        help="benchmarks a correr (por omisión, todos): " + ', '.join(sorted(BENCHMARKS)))
+    parser.add_argument('-o', '--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('-b', '--base', help="archivo JSON de una corrida anterior con la que comparar")
+    parser.add_argument('-u', '--umbral', type=float, default=UMBRAL, help="caída relativa que se considera regresión")
+    parser.add_argument('-r', '--repeticiones', type=int, default=REPETICIONES)
+    args = parser.parse_args()
+    for nombre in args.benchmarks:
+        if nombre not in BENCHMARKS:
+            parser.error("benchmark desconocido: {}".format(nombre))
+
+    resultados = medir(args.benchmarks, args.repeticiones)
+    for nombre, resultado in resultados.items():
+        tasas = ', '.join('{} {:.0f}'.format(medida, valor) for medida, valor in resultado.items() if medida != 'segundos')
+        print('{:24} {}'.format(nombre, tasas))
+
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'semilla': SEMILLA,
+                'resultados': resultados,
+            }, f, indent=2)
+
+    if args.base:
+        with open(args.base) as f:
+            base = json.load(f)['resultados']
+        regresiones = comparar(resultados, base, args.umbral)
+        for nombre, medida, anterior, actual in regresiones:
+            print('REGRESIÓN: {} {}: {:.0f} -> {:.0f} ({:+.1%})'.format(nombre, medida, anterior, actual, actual / anterior - 1))
+        if regresiones:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
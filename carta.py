@@ -1,6 +1,7 @@
 # Estas 3 constantes definen cómo se van a mostrar las cartas. Definirlas
 # según lo más adecuado a la plataforma. (Como modo "compatibilidad" definir
-# UNICODE_LINDO y COLOR en False y VALOR_10 en '10'.)
+# UNICODE_LINDO y COLOR en False y VALOR_10 en '10'.) Para cambiarlas una vez
+# cargado el módulo usar configurar_impresion().
 UNICODE_LINDO = False
 VALOR_10 = '10' # Posibles variantes '⒑', '⏨', '10'
 COLOR = False
@@ -25,28 +26,69 @@ DESCENDENTE = 1
 CONSECUTIVA = 2
 
 
+# Codificación de las cartas. Cada carta se representa con un entero chico:
+#   codigo = (valor - 1) + palo * 13 + (BOCA_ABAJO si la carta está boca abajo)
+# Los códigos 0-51 son las cartas boca arriba y 52-103 las mismas boca abajo.
+BOCA_ABAJO = 52
+CANT_CODIGOS = 2 * BOCA_ABAJO
+
+
+def codificar(valor, palo, boca_abajo=True):
+    """Devuelve el código entero de la carta de valor, palo y boca_abajo dados."""
+    if not 1 <= valor <= 13 or not PICAS <= palo <= TREBOLES:
+        raise ValueError("Carta inválida: {} {}".format(valor, palo))
+    return (valor - 1) + palo * 13 + (BOCA_ABAJO if boca_abajo else 0)
+
+
+def voltear_codigo(codigo):
+    """Devuelve el código de la carta codigo dada vuelta."""
+    return (codigo + BOCA_ABAJO) % CANT_CODIGOS
+
+
+def carta_de(codigo):
+    """Devuelve la Carta (compartida) correspondiente a un código."""
+    return _CARTAS[codigo]
+
+
 class Carta:
     """
         Clase que representa una carta de baraja francesa.
-        La clase posee tres atributos:
+        La clase posee tres atributos (de sólo lectura):
             valor: Un número del 1 al 13.
             palo: Un valor entre PICAS, CORAZONES, DIAMANTES y TREBOLES.
             boca_abajo: Un bool, indica si la carta está boca abajo.
+        Internamente la carta es sólo su codigo (ver codificar()). Las cartas
+        son inmutables y existe una única instancia por código: Carta(...)
+        devuelve siempre el mismo objeto para el mismo valor, palo y
+        boca_abajo.
     """
 
-    def __init__(self, valor, palo, boca_abajo=True):
-        """Crea una carta de un valor, palo y boca_abajo. Por omisión la carta
-        está boca abajo."""
-        self.valor = valor
-        self.palo = palo
-        self.boca_abajo = boca_abajo
+    __slots__ = ('codigo',)
+
+    def __new__(cls, valor, palo, boca_abajo=True):
+        """Devuelve la carta de un valor, palo y boca_abajo. Por omisión la
+        carta está boca abajo."""
+        return _CARTAS[codificar(valor, palo, boca_abajo)]
+
+    @property
+    def valor(self):
+        return self.codigo % 13 + 1
+
+    @property
+    def palo(self):
+        return self.codigo % BOCA_ABAJO // 13
+
+    @property
+    def boca_abajo(self):
+        return self.codigo >= BOCA_ABAJO
 
     def voltear(self):
-        """Da vuelta una carta."""
-        self.boca_abajo = not self.boca_abajo
+        """Devuelve la misma carta dada vuelta. (La carta original no se
+        modifica; para dar vuelta el tope de una pila ver PilaCartas.voltear.)"""
+        return _CARTAS[voltear_codigo(self.codigo)]
 
     def __str__(self):
-        return _c2s(self.valor, self.palo) if not self.boca_abajo else _c2s(0, 0)
+        return _GLIFOS[self.codigo]
 
     def __repr__(self):
         return str(self)
@@ -54,13 +96,55 @@ class Carta:
     def __eq__(self, other):
         return not self.boca_abajo and self.palo == other.palo and self.valor == other.valor
 
+    def __hash__(self):
+        return self.codigo
+
+    def __reduce__(self):
+        # Al copiar o serializar se recupera la misma instancia compartida.
+        return (carta_de, (self.codigo,))
+
+
+def _crear_carta(codigo):
+    carta = object.__new__(Carta)
+    carta.codigo = codigo
+    return carta
+
+_CARTAS = tuple(_crear_carta(codigo) for codigo in range(CANT_CODIGOS))
+
+
+_CRITERIOS = {}
 
 def criterio(palo=None, orden=None):
     """Generador de funciones de comparación de cartas.
         palo: Un valor entre MISMO_PALO, MISMO_COLOR, DISTINTO_PALO, DISTINTO_COLOR.
         orden: Un valor entre ASCENDENTE, DESCENDENTE o CONSECUTIVA.
     Devuelve una función de comparación cmp(a, b) que indica si la carta b es apilable
-    sobre la carta a según el criterio indicado."""
+    sobre la carta a según el criterio indicado.
+    El resultado se precalcula para todo par de códigos de carta: la función
+    tiene un atributo tabla tal que tabla[a.codigo * CANT_CODIGOS + b.codigo]
+    es cmp(a, b) y un atributo clave con el par (palo, orden). Se genera una
+    única función por cada par (palo, orden)."""
+    clave = (palo, orden)
+    if clave not in _CRITERIOS:
+        _CRITERIOS[clave] = _compilar_criterio(palo, orden)
+    return _CRITERIOS[clave]
+
+
+def _compilar_criterio(palo, orden):
+    """Arma la tabla de verdad de _comparador(palo, orden) y devuelve la
+    función de comparación que la consulta."""
+    cumple = _comparador(palo, orden)
+    tabla = tuple(cumple(a, b) for a in _CARTAS for b in _CARTAS)
+
+    def comp(a, b):
+        return tabla[a.codigo * CANT_CODIGOS + b.codigo]
+    comp.tabla = tabla
+    comp.clave = (palo, orden)
+    return comp
+
+
+def _comparador(palo, orden):
+    """Devuelve la función de comparación evaluando las reglas carta a carta."""
     def comp(a, b):
         if a.boca_abajo or b.boca_abajo:
             # Las cartas tienen que estar boca arriba.
@@ -131,3 +215,35 @@ def __c2s(valor, palo):
 
         return valores[valor-1] + palos[palo]
 
+
+
+def configurar_impresion(unicode_lindo=None, valor_10=None, color=None):
+    """Cambia las constantes UNICODE_LINDO, VALOR_10 y COLOR (las que no sean
+    None) y regenera la tabla de representaciones de las cartas. Cambiar
+    esas constantes directamente no tiene efecto hasta llamar a esta
+    función."""
+    global UNICODE_LINDO, VALOR_10, COLOR, _GLIFOS
+    if unicode_lindo is not None:
+        UNICODE_LINDO = unicode_lindo
+    if valor_10 is not None:
+        VALOR_10 = valor_10
+    if color is not None:
+        COLOR = color
+    _GLIFOS = tuple(_c2s(codigo % 13 + 1, codigo // 13) if codigo < BOCA_ABAJO else _c2s(0, 0)
+                    for codigo in range(CANT_CODIGOS))
+
+
+def glifos():
+    """Devuelve la tabla actual de representaciones de las cartas: una tupla
+    con el texto de cada código. Se reemplaza por otra tupla cada vez que se
+    llama a configurar_impresion()."""
+    return _GLIFOS
+
+
+def render_pila(codigos):
+    """Devuelve la representación de las cartas de la secuencia de códigos
+    codigos separadas por espacios."""
+    return ' '.join(map(_GLIFOS.__getitem__, codigos))
+
+
+configurar_impresion()
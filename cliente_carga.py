@@ -0,0 +1,109 @@
+from main import SOLITARIOS, crear_solitario
+from mesa import *
+from servidor import PUERTO, NUEVO, DIFF, ERROR, leer_respuesta
+
+import time, random, asyncio, argparse
+
+# Cantidad de clientes simultáneos y de comandos que manda cada uno.
+CLIENTES = 100
+JUGADAS = 100
+
+PERCENTILES = (50, 90, 99)
+
+
+async def jugar_cliente(conectar, juego, semilla, jugadas, diff, latencias):
+    """Juega una partida de juego contra el servidor: abre la conexión con
+    conectar(), y manda hasta jugadas comandos válidos elegidos al azar con
+    una copia local de la partida armada con la misma semilla. Agrega la
+    latencia de cada comando (en segundos) a latencias. Devuelve la cantidad
+    de respuestas de error."""
+    reader, writer = await conectar()
+    azar = random.Random(semilla)
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(random.Random(semilla))
+
+    errores = 0
+    try:
+        writer.write('{} {} {}{}\n'.format(NUEVO, juego, semilla, ' ' + DIFF if diff else '').encode())
+        await reader.readline()
+        await leer_respuesta(reader)
+        for _ in range(jugadas):
+            validas = solitario.jugadas_validas()
+            if solitario.termino() or not validas:
+                break
+            jugada = azar.choice(validas)
+            solitario.jugar(jugada)
+
+            inicio = time.perf_counter()
+            writer.write((mesa.formatear_jugada(jugada) + '\n').encode())
+            respuesta = await leer_respuesta(reader)
+            latencias.append(time.perf_counter() - inicio)
+            if respuesta is None:
+                break
+            errores += respuesta[0][0] == ERROR
+        writer.write(b'Q\n')
+        await writer.drain()
+    finally:
+        writer.close()
+    return errores
+
+
+async def cargar(juego, clientes, jugadas, diff=False, host='localhost', puerto=PUERTO, unix=None, semilla=0):
+    """Juega clientes partidas simultáneas de juego contra el servidor (ver
+    jugar_cliente), con las semillas semilla, semilla + 1, ... Devuelve un
+    diccionario con la cantidad de clientes, comandos y errores, los
+    segundos que tardó todo, los comandos por segundo y los percentiles
+    PERCENTILES y el máximo de latencia en milisegundos."""
+    if unix:
+        conectar = lambda: asyncio.open_unix_connection(unix)
+    else:
+        conectar = lambda: asyncio.open_connection(host, puerto)
+
+    latencias = []
+    inicio = time.perf_counter()
+    errores = await asyncio.gather(*(jugar_cliente(conectar, juego, semilla + i, jugadas, diff, latencias)
+                                     for i in range(clientes)))
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    resumen = {
+        'clientes': clientes,
+        'comandos': len(latencias),
+        'errores': sum(errores),
+        'segundos': segundos,
+        'comandos_por_segundo': len(latencias) / segundos,
+    }
+    for p in PERCENTILES:
+        resumen['p{}_ms'.format(p)] = percentil(latencias, p) * 1000
+    resumen['max_ms'] = latencias[-1] * 1000 if latencias else 0
+    return resumen
+
+
+def percentil(ordenados, p):
+    """Devuelve el percentil p (de 0 a 100) de la lista ordenada ordenados,
+    por el método del rango más cercano, o 0 si está vacía."""
+    if not ordenados:
+        return 0
+    return ordenados[max(0, -(-len(ordenados) * p // 100) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor de partidas.")
+    parser.add_argument('juego', choices=sorted(SOLITARIOS))
+    parser.add_argument('-c', '--clientes', type=int, default=CLIENTES, help="clientes simultáneos")
+    parser.add_argument('-j', '--jugadas', type=int, default=JUGADAS, help="comandos por cliente")
+    parser.add_argument('-d', '--diff', action='store_true', help="pedir sólo las líneas de la mesa que cambian")
+    parser.add_argument('-s', '--semilla', type=int, default=0, help="semilla del primer cliente")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('-p', '--puerto', type=int, default=PUERTO)
+    parser.add_argument('-u', '--unix', help="ruta del socket Unix del servidor")
+    args = parser.parse_args()
+
+    resumen = asyncio.run(cargar(args.juego, args.clientes, args.jugadas, args.diff,
+                                 args.host, args.puerto, args.unix, args.semilla))
+    for clave, valor in resumen.items():
+        print('{:22} {}'.format(clave, round(valor, 3) if isinstance(valor, float) else valor))
+
+if __name__ == "__main__":
+    main()
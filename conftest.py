@@ -0,0 +1,13 @@
+from carta import carta_de
+
+import pytest
+
+
+@pytest.fixture
+def fundacion_valida():
+    """Devuelve una función que indica si una fundación es una escalera del
+    mismo palo desde el As."""
+    def valida(fundacion):
+        cartas = [carta_de(codigo) for codigo in fundacion.codigos]
+        return all(carta.valor == i + 1 and carta.palo == cartas[0].palo for i, carta in enumerate(cartas))
+    return valida
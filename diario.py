@@ -0,0 +1,85 @@
+class Diario:
+    """Registro de los cambios primitivos hechos sobre las pilas de una mesa,
+    agrupados por jugada, que permite deshacerlas y rehacerlas.
+    Cada cambio es un par (pila, codigo) si se agregó la carta codigo al
+    tope de pila o (pila, [codigos]) si se quitaron esas cartas del tope.
+    Deshacer o rehacer una jugada cuesta O(cartas movidas en la jugada)."""
+
+    def __init__(self):
+        """Crea un diario vacío."""
+        self.jugadas = []
+        self.deshechas = []
+        self._actual = []
+        self._aplicando = False
+
+    def agregado(self, pila, codigo):
+        """Registra que se agregó la carta codigo al tope de pila."""
+        if not self._aplicando:
+            self._actual.append((pila, codigo))
+
+    def quitado(self, pila, codigos):
+        """Registra que se quitaron las cartas codigos del tope de pila."""
+        if not self._aplicando:
+            self._actual.append((pila, codigos))
+
+    def olvidar(self):
+        """Descarta todo lo registrado, sin deshacer nada."""
+        self.jugadas = []
+        self.deshechas = []
+        self._actual = []
+
+    def cerrar_jugada(self):
+        """Agrupa los cambios registrados desde la última jugada como una
+        jugada nueva. Una jugada nueva descarta las que podían rehacerse."""
+        if self._actual:
+            self.jugadas.append(self._actual)
+            self._actual = []
+            self.deshechas.clear()
+
+    def anular_jugada(self):
+        """Revierte los cambios registrados desde la última jugada cerrada
+        (por ejemplo, los de una jugada que falló a la mitad)."""
+        self._revertir(self._actual)
+        self._actual = []
+
+    def deshacer(self):
+        """Deshace la última jugada. Devuelve False si no había ninguna."""
+        self.anular_jugada()
+        if not self.jugadas:
+            return False
+        cambios = self.jugadas.pop()
+        self._revertir(cambios)
+        self.deshechas.append(cambios)
+        return True
+
+    def rehacer(self):
+        """Rehace la última jugada deshecha. Devuelve False si no había
+        ninguna."""
+        self.anular_jugada()
+        if not self.deshechas:
+            return False
+        cambios = self.deshechas.pop()
+        self._aplicando = True
+        try:
+            for pila, dato in cambios:
+                if isinstance(dato, int):
+                    pila._agregar(dato)
+                else:
+                    pila._quitar(len(dato))
+        finally:
+            self._aplicando = False
+        self.jugadas.append(cambios)
+        return True
+
+    def _revertir(self, cambios):
+        """Aplica la inversa de cambios, del último al primero."""
+        self._aplicando = True
+        try:
+            for pila, dato in reversed(cambios):
+                if isinstance(dato, int):
+                    pila._quitar(1)
+                else:
+                    for codigo in dato:
+                        pila._agregar(codigo)
+        finally:
+            self._aplicando = False
@@ -0,0 +1,320 @@
+from resolvedor import GANABLE, IMPOSIBLE, INDETERMINADO
+import resolver_clasico, resolver_eliminador, resolver_spider
+
+import os, sys, mmap, time, struct, argparse, multiprocessing
+
+# Índice persistente de qué semillas de cada juego pueden ganarse. Hay un
+# archivo por juego (DIRECTORIO/<juego>.idx): un encabezado con la primera
+# semilla del índice seguido de un registro de tamaño fijo por semilla, así
+# que el registro de una semilla se encuentra sin recorrer el archivo. El
+# archivo se lee con mmap.
+DIRECTORIO = 'semillas'
+EXTENSION = '.idx'
+
+MAGICO = b'SOLI'
+VERSION = 2
+
+# Versión de las reglas de los juegos y de los resolvedores con que se
+# calculan los veredictos. Hay que incrementarla cada vez que un cambio en
+# ellos pueda cambiar algún veredicto: los índices de otra versión no se
+# usan (y llenar() los vuelve a armar desde cero).
+REGLAS = 3
+
+# Mágico, versión del formato, versión de las reglas y primera semilla.
+ENCABEZADO = struct.Struct('<4sBxHq')
+
+# Veredicto (ver _CODIGOS), largo de la solución, nodos visitados por el
+# resolvedor y segundos que tardó. Un registro en cero es una semilla que
+# todavía no se resolvió.
+REGISTRO = struct.Struct('<BxHIf')
+
+SIN_RESOLVER = 0
+_CODIGOS = {GANABLE: 1, IMPOSIBLE: 2, INDETERMINADO: 3}
+_VEREDICTOS = {codigo: veredicto for veredicto, codigo in _CODIGOS.items()}
+
+# Límite de nodos que se le da a los resolvedores y ancho de la búsqueda de
+# Spider.
+LIMITE = 200000
+ANCHO_SPIDER = 50
+
+# Para cada juego, función que resuelve la partida de una semilla (repartida
+# como lo hace main) con un límite de nodos. Devuelve (veredicto, jugadas,
+# nodos). Clasico se resuelve sin poda para que los IMPOSIBLE guardados lo
+# sean de verdad (ver resolver_clasico.resolver).
+RESOLVEDORES = {
+    'Clasico': lambda semilla, limite: resolver_clasico.resolver_semilla(semilla, limite=limite, podar=False),
+    'Eliminador': lambda semilla, limite: resolver_eliminador.resolver_semilla(semilla, limite=limite),
+    'Spider': lambda semilla, limite: _nodos_spider(resolver_spider.resolver_semilla(semilla, ANCHO_SPIDER, limite=limite)),
+}
+
+
+def _nodos_spider(resultado):
+    """Devuelve el resultado de resolver_spider con la cantidad de nodos en
+    lugar de las estadísticas."""
+    veredicto, jugadas, estadisticas = resultado
+    return veredicto, jugadas if veredicto == GANABLE else None, estadisticas['nodos']
+
+
+def ruta_indice(juego, directorio=DIRECTORIO):
+    """Devuelve la ruta del archivo del índice de juego."""
+    return os.path.join(directorio, juego + EXTENSION)
+
+
+class IndiceSemillas:
+    """Índice de semillas de un juego, guardado en un archivo de registros
+    de tamaño fijo (ver ENCABEZADO y REGISTRO). Como atributos posee:
+        juego: str. Nombre del juego (ver main.SOLITARIOS).
+        desde: int. Semilla del primer registro.
+        cantidad: int. Cantidad de registros (semillas desde, desde + 1,
+            ...)."""
+
+    def __init__(self, juego, directorio=DIRECTORIO, escritura=False):
+        """Abre el índice de juego en directorio. Con escritura el índice se
+        crea (vacío, desde la semilla 0) si no existe o si es de otra versión
+        del formato o de las reglas (ver REGLAS); si no, levanta
+        FileNotFoundError si no existe y ValueError si el archivo no es un
+        índice o es de otra versión."""
+        self.juego = juego
+        self.ruta = ruta_indice(juego, directorio)
+        self.escritura = escritura
+        encabezado = _encabezado(self.ruta)
+        if escritura and (encabezado is None or encabezado[0] == MAGICO and encabezado[1:3] != (VERSION, REGLAS)):
+            os.makedirs(directorio, exist_ok=True)
+            with open(self.ruta, 'wb') as f:
+                f.write(ENCABEZADO.pack(MAGICO, VERSION, REGLAS, 0))
+        self._archivo = open(self.ruta, 'r+b' if escritura else 'rb')
+        self._mapa = None
+        try:
+            self._mapear()
+        except ValueError:
+            self._archivo.close()
+            raise
+
+    def _mapear(self):
+        """(Re)mapea el archivo en memoria y lee el encabezado."""
+        if self._mapa is not None:
+            self._mapa.close()
+        tamaño = os.fstat(self._archivo.fileno()).st_size
+        if tamaño < ENCABEZADO.size or (tamaño - ENCABEZADO.size) % REGISTRO.size:
+            raise ValueError("{} no es un índice de semillas".format(self.ruta))
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_WRITE if self.escritura else mmap.ACCESS_READ)
+        magico, version, reglas, self.desde = ENCABEZADO.unpack_from(self._mapa)
+        if magico != MAGICO:
+            raise ValueError("{} no es un índice de semillas".format(self.ruta))
+        if version != VERSION or reglas != REGLAS:
+            raise ValueError("{} es de otra versión del índice o de las reglas: hay que volver a llenarlo".format(self.ruta))
+        self.cantidad = (tamaño - ENCABEZADO.size) // REGISTRO.size
+
+    def consultar(self, semilla):
+        """Devuelve (veredicto, largo, nodos, segundos) de la semilla, o None
+        si no está en el índice o no se resolvió. largo es el largo de la
+        solución (0 si no es GANABLE)."""
+        i = semilla - self.desde
+        if not 0 <= i < self.cantidad:
+            return None
+        codigo, largo, nodos, segundos = REGISTRO.unpack_from(self._mapa, ENCABEZADO.size + i * REGISTRO.size)
+        if codigo == SIN_RESOLVER:
+            return None
+        return _VEREDICTOS[codigo], largo, nodos, segundos
+
+    def guardar(self, semilla, veredicto, largo, nodos, segundos):
+        """Guarda el resultado de resolver la semilla, que debe estar en el
+        rango del índice (ver ampliar)."""
+        i = semilla - self.desde
+        if not 0 <= i < self.cantidad:
+            raise IndexError("La semilla {} no está en el índice".format(semilla))
+        REGISTRO.pack_into(self._mapa, ENCABEZADO.size + i * REGISTRO.size,
+                           _CODIGOS[veredicto], min(largo, 0xFFFF), min(nodos, 0xFFFFFFFF), segundos)
+
+    def ampliar(self, desde, hasta):
+        """Agranda el índice para que incluya las semillas de [desde, hasta),
+        con registros sin resolver."""
+        nuevo_desde = min(desde, self.desde) if self.cantidad else desde
+        nuevo_hasta = max(hasta, self.desde + self.cantidad)
+        if nuevo_desde == self.desde and nuevo_hasta == self.desde + self.cantidad:
+            return
+        registros = self._mapa[ENCABEZADO.size:]
+        self._mapa.close()
+        self._mapa = None
+        antes = (self.desde - nuevo_desde) * REGISTRO.size if registros else 0
+        self._archivo.truncate(ENCABEZADO.size + (nuevo_hasta - nuevo_desde) * REGISTRO.size)
+        if antes or nuevo_desde != self.desde:
+            # Cambia la primera semilla: los registros se corren.
+            self._archivo.seek(0)
+            self._archivo.write(ENCABEZADO.pack(MAGICO, VERSION, REGLAS, nuevo_desde))
+            self._archivo.write(bytes(antes))
+            self._archivo.write(registros)
+            self._archivo.flush()
+        self._mapear()
+
+    def pendientes(self, desde, hasta, reintentar=False):
+        """Devuelve la lista de semillas de [desde, hasta) que no se
+        resolvieron (o cuyo veredicto es INDETERMINADO, si reintentar)."""
+        semillas = []
+        for semilla in range(desde, hasta):
+            resultado = self.consultar(semilla)
+            if resultado is None or reintentar and resultado[0] == INDETERMINADO:
+                semillas.append(semilla)
+        return semillas
+
+    def _veredictos(self):
+        """Devuelve los códigos de veredicto de todos los registros."""
+        return self._mapa[ENCABEZADO.size::REGISTRO.size]
+
+    def resumen(self):
+        """Devuelve un diccionario veredicto -> cantidad de semillas (incluye
+        'sin_resolver')."""
+        codigos = self._veredictos()
+        resumen = {veredicto: codigos.count(codigo) for veredicto, codigo in _CODIGOS.items()}
+        resumen['sin_resolver'] = codigos.count(SIN_RESOLVER)
+        return resumen
+
+    def semilla_ganable(self, azar):
+        """Devuelve una semilla GANABLE elegida con el generador azar, o None
+        si no hay ninguna."""
+        codigos = self._veredictos()
+        ganable = bytes((_CODIGOS[GANABLE],))
+        cantidad = codigos.count(ganable)
+        if not cantidad:
+            return None
+        i = -1
+        for _ in range(azar.randrange(cantidad) + 1):
+            i = codigos.find(ganable, i + 1)
+        return self.desde + i
+
+    def cerrar(self):
+        """Cierra el índice, escribiendo en disco lo guardado."""
+        if self._mapa is not None:
+            if self.escritura:
+                self._mapa.flush()
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+def _encabezado(ruta):
+    """Devuelve el encabezado (ver ENCABEZADO) del archivo ruta, o None si
+    no existe o es más corto."""
+    try:
+        with open(ruta, 'rb') as f:
+            datos = f.read(ENCABEZADO.size)
+    except FileNotFoundError:
+        return None
+    return ENCABEZADO.unpack(datos) if len(datos) == ENCABEZADO.size else None
+
+
+def _vigente(ruta):
+    """Indica si en ruta hay un índice de la versión actual del formato y
+    de las reglas."""
+    encabezado = _encabezado(ruta)
+    return encabezado is not None and encabezado[:3] == (MAGICO, VERSION, REGLAS)
+
+
+def tiene_ganables(juego, directorio=DIRECTORIO):
+    """Devuelve si hay un índice de juego con alguna semilla GANABLE."""
+    if not _vigente(ruta_indice(juego, directorio)):
+        return False
+    with IndiceSemillas(juego, directorio) as indice:
+        return indice.resumen()[GANABLE] > 0
+
+
+def semilla_ganable(juego, azar, directorio=DIRECTORIO):
+    """Devuelve una semilla GANABLE de juego elegida con el generador azar, o
+    None si no hay índice o no tiene ninguna."""
+    if not _vigente(ruta_indice(juego, directorio)):
+        return None
+    with IndiceSemillas(juego, directorio) as indice:
+        return indice.semilla_ganable(azar)
+
+
+def _resolver(tarea):
+    """Resuelve la semilla de la tarea (juego, semilla, limite). Devuelve
+    (semilla, veredicto, largo, nodos, segundos)."""
+    juego, semilla, limite = tarea
+    inicio = time.perf_counter()
+    veredicto, jugadas, nodos = RESOLVEDORES[juego](semilla, limite)
+    return semilla, veredicto, len(jugadas) if jugadas else 0, nodos, time.perf_counter() - inicio
+
+
+def llenar(juego, desde, hasta, procesos=None, limite=LIMITE, reintentar=False, directorio=DIRECTORIO, salida=sys.stdout):
+    """Resuelve las semillas de [desde, hasta) de juego que todavía no estén
+    en el índice (y las INDETERMINADO, si reintentar) repartiéndolas entre
+    procesos procesos (todos los procesadores si es None; si es 1 no se
+    crean procesos), y guarda cada resultado en el índice a medida que
+    llega, así que si se interrumpe no se pierde lo ya resuelto. Escribe el
+    avance en salida. Devuelve la cantidad de semillas resueltas."""
+    if juego not in RESOLVEDORES:
+        raise ValueError("No hay resolvedor para {}".format(juego))
+
+    with IndiceSemillas(juego, directorio, escritura=True) as indice:
+        indice.ampliar(desde, hasta)
+        tareas = [(juego, semilla, limite) for semilla in indice.pendientes(desde, hasta, reintentar)]
+
+        if procesos == 1:
+            resultados = map(_resolver, tareas)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(procesos)
+            resultados = pool.imap_unordered(_resolver, tareas)
+
+        resueltas = 0
+        try:
+            for semilla, veredicto, largo, nodos, segundos in resultados:
+                indice.guardar(semilla, veredicto, largo, nodos, segundos)
+                resueltas += 1
+                salida.write('{} {} {} {} {:.3f}\n'.format(semilla, veredicto, largo, nodos, segundos))
+        finally:
+            if pool:
+                pool.terminate()
+                pool.join()
+        salida.flush()
+        return resueltas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice persistente de semillas ganables.")
+    parser.add_argument('-d', '--directorio', default=DIRECTORIO)
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    llenado = comandos.add_parser('llenar', help="resolver las semillas de un rango que falten en el índice")
+    llenado.add_argument('juego', choices=sorted(RESOLVEDORES))
+    llenado.add_argument('desde', type=int, help="primera semilla")
+    llenado.add_argument('hasta', type=int, help="semilla final (no incluida)")
+    llenado.add_argument('-j', '--procesos', type=int, default=None, help="procesos a usar (por omisión, todos los procesadores)")
+    llenado.add_argument('-l', '--limite', type=int, default=LIMITE, help="límite de nodos del resolvedor")
+    llenado.add_argument('-r', '--reintentar', action='store_true', help="volver a resolver las semillas indeterminadas")
+
+    consulta = comandos.add_parser('consultar', help="mostrar el veredicto de semillas")
+    consulta.add_argument('juego', choices=sorted(RESOLVEDORES))
+    consulta.add_argument('semillas', type=int, nargs='*', help="semillas (sin ninguna, un resumen del índice)")
+    args = parser.parse_args()
+
+    if args.comando == 'llenar':
+        llenar(args.juego, args.desde, args.hasta, args.procesos, args.limite, args.reintentar, args.directorio)
+        return
+
+    try:
+        indice = IndiceSemillas(args.juego, args.directorio)
+    except FileNotFoundError:
+        print("No hay índice de", args.juego)
+        return
+    except ValueError as e:
+        print(e)
+        return
+    with indice:
+        if not args.semillas:
+            print('semillas {}-{}'.format(indice.desde, indice.desde + indice.cantidad))
+            for veredicto, cantidad in indice.resumen().items():
+                print(veredicto, cantidad)
+        for semilla in args.semillas:
+            resultado = indice.consultar(semilla)
+            print(semilla, *(resultado or ('sin_resolver',)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+from main import LOGFILE, CHECKPOINT
+from mesa import *
+
+import os, sys, mmap, struct, bisect
+
+# Formato binario de los logs de juego:
+#   Encabezado: MAGICO, VERSION (1 byte), semilla ('<q'), largo del nombre
+#       del juego (1 byte) y el nombre en UTF-8.
+#   Jugadas: BYTES_JUGADA bytes por comando, uno por cada par (PILA, índice)
+#       de la jugada (ver codificar_par), completando con SIN_PAR. Los
+#       comandos que empiezan con DESHACER o REHACER se guardan con ese
+#       único par, que es el único que usa main.ejecutar.
+#   Fotos: el snapshot de la mesa de cada foto (ver Mesa.snapshot).
+#   Índice: por cada foto, (comandos anteriores, desplazamiento, largo)
+#       con el formato ENTRADA_INDICE.
+#   Cola: (desplazamiento de las jugadas, cantidad de jugadas,
+#       desplazamiento del índice, cantidad de fotos, MAGICO) con el formato
+#       COLA, que se lee desde el final del archivo.
+# Como las jugadas tienen ancho fijo, la jugada n está en
+# desplazamiento + n * BYTES_JUGADA.
+MAGICO = b'SOLB'
+VERSION = 1
+BYTES_JUGADA = 2
+SIN_PAR = 0xFF
+INVALIDA = 0xFE
+ENCABEZADO = struct.Struct('<4sBqB')
+ENTRADA_INDICE = struct.Struct('<QQI')
+COLA = struct.Struct('<QQQQ4s')
+
+# Tipo de pila que corresponde a cada letra de comando que no es FUNDACION
+# ni PILA_TABLERO (ver mesa.LETRAS).
+_PILAS = {c: pila for pila, c in LETRAS.items()}
+
+# Comando que se escribe en los logs de texto para una jugada INVALIDA: los
+# solitarios rechazan siempre las jugadas de más de dos pilas (las que
+# empiezan con DESHACER o REHACER no llegan a ser INVALIDA, ver
+# comando_a_bytes).
+COMANDO_INVALIDO = 'MMM'
+
+
+def codificar_par(pila, indice):
+    """Codifica un par (PILA, índice) en un byte: 4 bits para cada uno."""
+    return pila << 4 | indice
+
+
+def comando_a_bytes(comando):
+    """Codifica un comando de texto del log en BYTES_JUGADA bytes. De un
+    comando que empieza con DESHACER o REHACER ('UUU') sólo se guarda el
+    primer par: es la jugada que ejecuta main.ejecutar."""
+    pares = []
+    for c in comando.upper():
+        if c.isdigit():
+            pares.append(codificar_par(FUNDACION, int(c) - 1))
+        elif c in _PILAS:
+            pares.append(codificar_par(_PILAS[c], 0))
+        else:
+            pares.append(codificar_par(PILA_TABLERO, ord(c) - ord('A')))
+    if pares and pares[0] >> 4 in (DESHACER, REHACER):
+        pares = pares[:1]
+    if len(pares) > BYTES_JUGADA:
+        pares = [INVALIDA] * BYTES_JUGADA
+    return bytes(pares + [SIN_PAR] * (BYTES_JUGADA - len(pares)))
+
+
+def bytes_a_jugada(datos):
+    """Decodifica los bytes de un comando en una jugada (lista de pares
+    (PILA, índice)), o None si era una jugada INVALIDA."""
+    if datos[0] == INVALIDA:
+        return None
+    return [(b >> 4, b & 0xF) for b in datos if b != SIN_PAR]
+
+
+def jugada_a_comando(jugada):
+    """Convierte una jugada (o None) al comando de texto equivalente."""
+    if jugada is None:
+        return COMANDO_INVALIDO
+    return Mesa.formatear_jugada(jugada)
+
+
+def foto_a_bytes(foto):
+    """Convierte una foto de texto de la mesa (ver main.foto_mesa) al
+    snapshot de la mesa (ver Mesa.snapshot)."""
+    return bytes.fromhex(foto)
+
+
+def bytes_a_foto(datos):
+    """Inversa de foto_a_bytes."""
+    return bytes(datos).hex()
+
+
+class EscritorLog:
+    """Escribe un log binario. Las jugadas se escriben a medida que llegan;
+    las fotos se guardan en memoria hasta cerrar(), que escribe las fotos,
+    el índice y la cola."""
+
+    def __init__(self, ruta, semilla, juego):
+        """Crea el archivo ruta y escribe el encabezado."""
+        self.archivo = open(ruta, 'wb')
+        nombre = juego.encode('utf-8')
+        self.archivo.write(ENCABEZADO.pack(MAGICO, VERSION, semilla, len(nombre)) + nombre)
+        self.inicio_jugadas = self.archivo.tell()
+        self.cantidad = 0
+        self.fotos = []
+
+    def comando(self, comando):
+        """Agrega un comando de texto."""
+        self.archivo.write(comando_a_bytes(comando))
+        self.cantidad += 1
+
+    def foto(self, foto):
+        """Agrega una foto de la mesa tomada después del último comando."""
+        self.fotos.append((self.cantidad, foto_a_bytes(foto)))
+
+    def cerrar(self):
+        """Escribe las fotos, el índice y la cola, y cierra el archivo."""
+        entradas = []
+        for cantidad, datos in self.fotos:
+            entradas.append(ENTRADA_INDICE.pack(cantidad, self.archivo.tell(), len(datos)))
+            self.archivo.write(datos)
+        inicio_indice = self.archivo.tell()
+        self.archivo.write(b''.join(entradas))
+        self.archivo.write(COLA.pack(self.inicio_jugadas, self.cantidad, inicio_indice, len(entradas), MAGICO))
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class LectorLog:
+    """Lee un log binario mapeándolo en memoria: acceder a la jugada n o a la
+    última foto anterior a ella no requiere recorrer el archivo.
+    Atributos: semilla, juego y cantidad (de comandos)."""
+
+    def __init__(self, ruta):
+        """Abre el log binario ruta. Levanta ValueError si no es válido."""
+        with open(ruta, 'rb') as archivo:
+            if os.fstat(archivo.fileno()).st_size < ENCABEZADO.size + COLA.size:
+                raise ValueError("No es un log binario válido: {}".format(ruta))
+            self.datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magico, version, self.semilla, largo = ENCABEZADO.unpack_from(self.datos, 0)
+        cola = COLA.unpack_from(self.datos, len(self.datos) - COLA.size)
+        self._inicio_jugadas, self.cantidad, self._inicio_indice, self._cantidad_fotos = cola[:4]
+        if (magico != MAGICO or cola[4] != MAGICO or version != VERSION
+                or self._inicio_jugadas < ENCABEZADO.size + largo
+                or self._inicio_jugadas + self.cantidad * BYTES_JUGADA > self._inicio_indice
+                or self._inicio_indice + self._cantidad_fotos * ENTRADA_INDICE.size != len(self.datos) - COLA.size):
+            self.cerrar()
+            raise ValueError("No es un log binario válido: {}".format(ruta))
+        try:
+            self.juego = self.datos[ENCABEZADO.size:ENCABEZADO.size + largo].decode('utf-8')
+        except UnicodeDecodeError:
+            self.cerrar()
+            raise ValueError("No es un log binario válido: {}".format(ruta)) from None
+        self._posiciones_fotos = [self._entrada(i)[0] for i in range(self._cantidad_fotos)]
+
+    def jugada(self, n):
+        """Devuelve la jugada del comando n (o None si era INVALIDA)."""
+        if not 0 <= n < self.cantidad:
+            raise IndexError(n)
+        inicio = self._inicio_jugadas + n * BYTES_JUGADA
+        return bytes_a_jugada(self.datos[inicio:inicio + BYTES_JUGADA])
+
+    def comando(self, n):
+        """Devuelve el comando de texto n."""
+        return jugada_a_comando(self.jugada(n))
+
+    def comandos(self, desde=0, hasta=None):
+        """Genera los comandos de texto del rango [desde, hasta)."""
+        for n in range(desde, self.cantidad if hasta is None else hasta):
+            yield self.comando(n)
+
+    def fotos(self):
+        """Devuelve la lista de pares (comandos anteriores, foto de texto)."""
+        return [self._foto(i) for i in range(self._cantidad_fotos)]
+
+    def foto_anterior(self, n):
+        """Devuelve el par (comandos anteriores, foto de texto) de la última
+        foto tomada antes del comando n, o (0, None) si no hay ninguna."""
+        i = bisect.bisect_right(self._posiciones_fotos, n)
+        if not i:
+            return 0, None
+        return self._foto(i - 1)
+
+    def cerrar(self):
+        """Libera el archivo."""
+        self.datos.close()
+
+    def _entrada(self, i):
+        return ENTRADA_INDICE.unpack_from(self.datos, self._inicio_indice + i * ENTRADA_INDICE.size)
+
+    def _foto(self, i):
+        cantidad, inicio, largo = self._entrada(i)
+        return cantidad, bytes_a_foto(self.datos[inicio:inicio + largo])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+def texto_a_binario(ruta_texto, ruta_binaria):
+    """Convierte un log de texto (el que escribe main) a binario."""
+    with open(ruta_texto) as f:
+        semilla = int(f.readline().rstrip('\n'))
+        juego = f.readline().rstrip('\n')
+        with EscritorLog(ruta_binaria, semilla, juego) as escritor:
+            for linea in f:
+                linea = linea.rstrip('\n')
+                if linea.startswith(CHECKPOINT):
+                    escritor.foto(linea[len(CHECKPOINT):])
+                else:
+                    escritor.comando(linea)
+
+
+def binario_a_texto(ruta_binaria, ruta_texto):
+    """Convierte un log binario al formato de texto que lee main."""
+    with LectorLog(ruta_binaria) as lector, open(ruta_texto, 'w') as f:
+        f.write('{}\n{}\n'.format(lector.semilla, lector.juego))
+        fotos = lector.fotos()
+        siguiente = 0
+        for n in range(lector.cantidad + 1):
+            while siguiente < len(fotos) and fotos[siguiente][0] == n:
+                f.write(CHECKPOINT + fotos[siguiente][1] + '\n')
+                siguiente += 1
+            if n < lector.cantidad:
+                f.write(lector.comando(n) + '\n')
+
+
+def main():
+    """Uso: log_binario.py a-binario [LOG_TEXTO] LOG_BINARIO
+           log_binario.py a-texto LOG_BINARIO [LOG_TEXTO]
+    Convierte entre el log de texto (por omisión solitario.log) y el binario."""
+    if len(sys.argv) == 3:
+        sys.argv.insert(2 if sys.argv[1] == 'a-binario' else 3, LOGFILE)
+    if len(sys.argv) != 4 or sys.argv[1] not in ('a-binario', 'a-texto'):
+        print(main.__doc__)
+        return
+    if sys.argv[1] == 'a-binario':
+        texto_a_binario(sys.argv[2], sys.argv[3])
+    else:
+        binario_a_texto(sys.argv[2], sys.argv[3])
+
+if __name__ == "__main__":
+    main()
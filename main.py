@@ -1,58 +1,263 @@
 from solitario_ejemplo import *
+from solitario_clasico import SolitarioClasico
+from solitario_eliminador import SolitarioEliminador
+from solitario_spider import SolitarioSpider
 
 SOLITARIOS = {
 	# "Nombre": (Clase, parámetros constructor),
         "Ejemplo": (SolitarioEjemplo, None),
+        "Clasico": (SolitarioClasico, None),
+        "Eliminador": (SolitarioEliminador, None),
+        "Spider": (SolitarioSpider, None),
     }
 
 LOGFILE = 'solitario.log'
 
+# Cada cuántos comandos se escribe en el log una foto de la mesa, para que al
+# recuperar el juego no haga falta repetir todos los comandos desde el inicio.
+# Las líneas de foto empiezan con CHECKPOINT. Las fotos no cortan el diario:
+# puede deshacerse más allá de la última (ver reproducir_log).
+CADA_CHECKPOINT = 50
+CHECKPOINT = '@'
+
+# Milisegundos que se dedican a buscar la sugerencia de jugada pedida con '?'
+# (ver sugeridor.sugerir) y cantidad de jugadas sugeridas que se muestran.
+PRESUPUESTO_SUGERENCIA_MS = 1000
+SUGERENCIAS = 3
+
+# Modo sin interfaz (ver jugar_flujo): las líneas de la entrada que empiezan
+# con ENCABEZADO comienzan una partida nueva ('# <semilla> <juego>').
+ENCABEZADO = '#'
+
 from mesa import *
+import perfilador
+import sugeridor
+import indice_semillas
 
-import sys, random, datetime
+import sys, json, random, datetime
 
 def loguear(logfile, valor):
     if logfile:
         logfile.write('{}\n'.format(valor))
 
-def recuperar():
+def recuperar(ruta=LOGFILE):
+    """Lee el log de ruta. Devuelve (seed, juego, tramos) donde tramos es
+    la lista de pares (foto, comandos) en que las fotos (ver CHECKPOINT)
+    dividen el log: el primero tiene foto None (el reparto) y los comandos
+    anteriores a la primera foto, y cada uno de los siguientes una foto y
+    los comandos posteriores a ella. El log se recorre una sola vez. Levanta
+    IOError o ValueError si no puede leerse."""
+    with open(ruta) as f:
+        seed = int(f.readline().rstrip('\n'))
+        juego = f.readline().rstrip('\n')
+        comandos = []
+        tramos = [(None, comandos)]
+        for linea in f:
+            linea = linea.rstrip('\n')
+            if linea.startswith(CHECKPOINT):
+                comandos = []
+                tramos.append((linea[len(CHECKPOINT):], comandos))
+            else:
+                comandos.append(linea)
+    return (seed, juego, tramos)
+
+def foto_mesa(mesa):
+    """Devuelve una representación compacta (texto) del contenido de la mesa:
+    su snapshot() en hexadecimal."""
+    return mesa.snapshot().hex()
+
+def cargar_foto(mesa, foto):
+    """Vuelve la mesa (ya armada) al contenido de una foto de foto_mesa()."""
+    mesa.restore(bytes.fromhex(foto))
+
+def ejecutar(mesa, solitario, jugada):
+    """Ejecuta una jugada ya parseada (que no sea SALIR), incluyendo deshacer
+    y rehacer. Levanta SolitarioError si no puede hacerse; en ese caso la
+    mesa queda como estaba."""
+    if jugada[0][0] == DESHACER:
+        if not mesa.deshacer():
+            raise SolitarioError("No hay jugadas para deshacer")
+        return
+    if jugada[0][0] == REHACER:
+        if not mesa.rehacer():
+            raise SolitarioError("No hay jugadas para rehacer")
+        return
+
     try:
-        with open(LOGFILE) as f:
-            seed = int(f.readline().rstrip('\n'))
-            juego = f.readline().rstrip('\n')
-            comandos = [l.rstrip('\n') for l in f]
-    except (IOError, ValueError):
-        print("ERROR: No pudo recuperarse el juego")
-        return None
-    return (seed, juego, comandos)
+        solitario.jugar(jugada)
+    except SolitarioError:
+        mesa.revertir_jugada()
+        raise
+    mesa.confirmar_jugada()
+
+def reproducir(mesa, solitario, comandos):
+    """Ejecuta los comandos recuperados del log sin imprimir nada. Devuelve
+    la cantidad de DESHACER y REHACER que no encontraron jugada para deshacer
+    o rehacer."""
+    fallidos = 0
+    for comando in comandos:
+        if solitario.termino():
+            break
+        jugada = mesa.parsear_jugada(comando)
+        if not jugada or jugada[0][0] in (SALIR, SUGERIR):
+            continue
+        try:
+            ejecutar(mesa, solitario, jugada)
+        except SolitarioError:
+            fallidos += jugada[0][0] in (DESHACER, REHACER)
+    return fallidos
+
+def reproducir_log(mesa, solitario, tramos):
+    """Lleva la mesa recién armada (con diario) al estado final de los
+    tramos de un log (ver recuperar). Se reproduce desde la última foto; si
+    algún DESHACER o REHACER necesitaba el diario de antes de ella (en la
+    partida original pudo tener éxito), se vuelve a reproducir desde la foto
+    anterior, y así hasta el reparto si hace falta. Las fotos que no pueden
+    cargarse (por ejemplo, una línea cortada al caerse el programa) también
+    se saltean. Devuelve la cantidad de comandos posteriores a la última
+    foto."""
+    inicial = mesa.snapshot()
+    for i in range(len(tramos) - 1, -1, -1):
+        foto = tramos[i][0]
+        if foto is None:
+            mesa.restore(inicial)
+        else:
+            try:
+                cargar_foto(mesa, foto)
+            except ValueError:
+                continue
+        comandos = [comando for _, posteriores in tramos[i:] for comando in posteriores]
+        if not reproducir(mesa, solitario, comandos) or i == 0:
+            break
+    return len(tramos[-1][1])
+
+def sugerir(mesa, solitario):
+    """Muestra las jugadas que más chances tienen de ganar la partida según
+    sugeridor.sugerir, con la probabilidad estimada y su intervalo de
+    confianza."""
+    _, estadisticas = sugeridor.sugerir(mesa, solitario, PRESUPUESTO_SUGERENCIA_MS)
+    if not estadisticas:
+        print("No hay jugadas posibles")
+        return
+    for e in estadisticas[:SUGERENCIAS]:
+        inferior, superior = e['intervalo']
+        print('{:4} {:6.1%} [{:.1%}-{:.1%}] ({} partidas)'.format(
+            mesa.formatear_jugada(e['jugada']), e['probabilidad'], inferior, superior, e['partidas']))
+
+def crear_solitario(juego, mesa):
+    """Crea el solitario de nombre juego (ver SOLITARIOS) sobre la mesa."""
+    constructor, parametros = SOLITARIOS[juego]
+    if parametros:
+        return constructor(mesa, *parametros)
+    return constructor(mesa)
+
+def jugar_flujo(entrada, salida, con_huella=False):
+    """Juega las partidas descriptas por las líneas de entrada sin
+    interacción: cada partida empieza con una línea '# <semilla> <juego>'
+    (ver ENCABEZADO) y sigue con comandos como los de la partida
+    interactiva. Por cada comando escribe en salida una línea JSON con
+    juego, semilla, comando, jugada (la jugada parseada o null), ok, error
+    (el mensaje o null) y termino; con con_huella también la huella de la
+    mesa después del comando (ver Mesa.huella) en hexadecimal. Los
+    encabezados inválidos y los comandos sin partida producen una línea con
+    ok false y el error. Devuelve la cantidad de comandos procesados."""
+    escribir = salida.write
+    codificar = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    juego = semilla = mesa = solitario = None
+    n = 0
+    for linea in entrada:
+        linea = linea.strip()
+        if not linea:
+            continue
+
+        if linea.startswith(ENCABEZADO):
+            juego = semilla = mesa = solitario = None
+            try:
+                texto_semilla, nombre = linea[len(ENCABEZADO):].split()
+                semilla, juego = int(texto_semilla), nombre
+                mesa = Mesa()
+                solitario = crear_solitario(juego, mesa)
+            except (ValueError, KeyError):
+                juego = semilla = mesa = solitario = None
+                escribir(codificar({'encabezado': linea, 'ok': False, 'error': "Encabezado inválido"}) + '\n')
+                continue
+            solitario.armar(random.Random(semilla))
+            mesa.iniciar_diario()
+            continue
+
+        n += 1
+        resultado = {'juego': juego, 'semilla': semilla, 'comando': linea, 'jugada': None, 'ok': False, 'error': None}
+        jugada = mesa.parsear_jugada(linea) if mesa else None
+        if mesa is None:
+            resultado['error'] = "No hay partida"
+        elif solitario.termino():
+            resultado['error'] = "El juego terminó"
+        elif not jugada or jugada[0][0] in (SALIR, SUGERIR):
+            resultado['error'] = "Comando incorrecto"
+        else:
+            resultado['jugada'] = jugada
+            try:
+                ejecutar(mesa, solitario, jugada)
+                resultado['ok'] = True
+            except SolitarioError as e:
+                resultado['error'] = str(e)
+        if mesa is not None:
+            resultado['termino'] = solitario.termino()
+            if con_huella:
+                resultado['huella'] = '{:016x}'.format(mesa.huella())
+        escribir(codificar(resultado) + '\n')
+    return n
 
 def pedir_juego(juegos):
+    """Muestra el menú de juegos y devuelve (juego, solo_ganables) según la
+    opción elegida, o None para salir. Los juegos con semillas ganables en
+    el índice (ver indice_semillas) tienen además una opción para jugar sólo
+    partidas que pueden ganarse."""
     print("SOLITARIOS:")
-    juegos = sorted(juegos)
-    for i,s in enumerate(juegos):
-        print(i + 1, s)
+    opciones = [(juego, False) for juego in sorted(juegos)]
+    opciones += [(juego, True) for juego in sorted(juegos) if indice_semillas.tiene_ganables(juego)]
+    for i,(s, solo_ganables) in enumerate(opciones):
+        print(i + 1, s + (' (sólo partidas ganables)' if solo_ganables else ''))
     print("Otra cosa para salir")
     try:
         n = int(input('Opción: '))
     except ValueError:
         return None
 
-    if n <= 0 or n > len(juegos):
+    if n <= 0 or n > len(opciones):
         return None
 
-    return juegos[n - 1]
+    return opciones[n - 1]
 
 def main():
     resume = False
     seed = int(datetime.datetime.now().timestamp())
     juego = None
-    comandos = []
+    tramos = [(None, [])]
+
+    # Con -perfil (o la variable de entorno perfilador.VARIABLE) se miden
+    # las partes críticas del motor y se guardan los resultados al salir.
+    perfilador.instalar_si_pedido([clase for clase, _ in SOLITARIOS.values()], '-perfil' in sys.argv[1:])
 
-    if len(sys.argv) == 2 and sys.argv[1] == '-resume':
-        r = recuperar()
-        if r:
+    # Con -flujo se juegan sin interacción las partidas del archivo indicado
+    # (o de la entrada estándar) y se escribe el resultado de cada comando
+    # como JSON (ver jugar_flujo); -huella agrega la huella de la mesa.
+    if '-flujo' in sys.argv[1:]:
+        archivos = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+        con_huella = '-huella' in sys.argv[1:]
+        if archivos:
+            with open(archivos[0]) as entrada:
+                jugar_flujo(entrada, sys.stdout, con_huella)
+        else:
+            jugar_flujo(sys.stdin, sys.stdout, con_huella)
+        return
+
+    if '-resume' in sys.argv[1:]:
+        try:
+            seed, juego, tramos = recuperar()
             resume = True
-            seed, juego, comandos = r
+        except (IOError, ValueError):
+            print("ERROR: No pudo recuperarse el juego")
 
     random.seed(seed)
 
@@ -63,9 +268,13 @@ def main():
         except IOError:
             pass
     else:
-        juego = pedir_juego(SOLITARIOS.keys())
-        if not juego:
+        opcion = pedir_juego(SOLITARIOS.keys())
+        if not opcion:
             return
+        juego, solo_ganables = opcion
+        if solo_ganables:
+            seed = indice_semillas.semilla_ganable(juego, random)
+            random.seed(seed)
 
         try:
             logfile = open(LOGFILE, 'w')
@@ -81,22 +290,15 @@ def main():
 
     mesa = Mesa()
 
-    constructor, parametros = SOLITARIOS[juego]
-    if parametros:
-        solitario = constructor(mesa, *parametros)
-    else:
-        solitario = constructor(mesa)
+    solitario = crear_solitario(juego, mesa)
 
     solitario.armar()
+    mesa.iniciar_diario()
+    desde_foto = reproducir_log(mesa, solitario, tramos)
+
     mesa.imprimir()
     while not solitario.termino():
-        if comandos:
-            comando = comandos.pop(0)
-            print("COMANDO:", comando)
-        else:
-            comando = input(mesa.mensaje_jugada())
-            resume = False
-
+        comando = input(mesa.mensaje_jugada())
         jugada = mesa.parsear_jugada(comando)
 
         if not jugada:
@@ -106,17 +308,24 @@ def main():
         if jugada[0][0] == SALIR:
             break
 
-        if not resume:
-            loguear(logfile, comando)
+        if jugada[0][0] == SUGERIR:
+            sugerir(mesa, solitario)
+            continue
+
+        loguear(logfile, comando)
 
         try:
-            solitario.jugar(jugada)
+            ejecutar(mesa, solitario, jugada)
         except SolitarioError as e:
             print("ERROR:", e)
-            continue
+        else:
+            print()
+            mesa.imprimir()
 
-        print()
-        mesa.imprimir()
+        desde_foto += 1
+        if logfile and desde_foto >= CADA_CHECKPOINT:
+            loguear(logfile, CHECKPOINT + foto_mesa(mesa))
+            desde_foto = 0
 
     print()
     print("Juego Terminado!")
@@ -1,11 +1,79 @@
 from pila_cartas import *
 import random
 
-def crear_mazo(mazos=1, palos=4):
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Palos que completan cada mazo de 52 cartas según la cantidad de palos pedida.
+_PALOS_MAZO = {
+    1: (PICAS,) * 4,
+    2: (PICAS, TREBOLES) * 2,
+    4: (PICAS, CORAZONES, DIAMANTES, TREBOLES),
+}
+
+def crear_mazo(mazos=1, palos=4, azar=None, orden=None):
     """Devuelve una PilaCartas con las cartas boca abajo y mezcladas.
     Cada mazo de los mazos tiene 52 cartas, y puede ser completado con 1, 2 o 4 palos.
     En caso de que estén los 4 palos el mazo se conformará con la serie del 1 al 13
     para cada uno de ellos, en caso de ser sólo 2 palos serán 2 veces la serie 1 al 13
     para dos palos del mismo color y en caso de ser 1 sólo palo será 4 veces la serie 1 al 13
-    para ese palo."""
-    pass
+    para ese palo.
+    La mezcla usa el generador azar (un random.Random) o, si es None, el
+    generador global del módulo random.
+    Si se da orden, el mazo no se mezcla sino que tiene esos códigos de carta
+    de base a tope: una secuencia de enteros o un objeto con protocolo de
+    buffer de bytes, como una fila de crear_mazos(), que se lee sin copiarla."""
+    if palos not in _PALOS_MAZO:
+        raise ValueError("Cantidad de palos inválida: {}".format(palos))
+
+    if orden is None:
+        codigos = _codigos_mazo(mazos, palos)
+        (azar or random).shuffle(codigos)
+    else:
+        try:
+            codigos = memoryview(orden)
+        except TypeError:
+            codigos = orden
+        if len(codigos) != 52 * mazos:
+            raise ValueError("El orden debe tener {} cartas".format(52 * mazos))
+
+    mazo = PilaCartas()
+    mazo.extender(codigos)
+    return mazo
+
+
+def crear_mazos(semillas, mazos=1, palos=4):
+    """Mezcla de una vez un mazo como el de crear_mazo(mazos, palos) por cada
+    semilla de semillas (enteros). Devuelve un arreglo de numpy de uint8 con
+    una fila por semilla, con los códigos de carta del mazo de base a tope;
+    cada fila puede pasarse como orden a crear_mazo() o a Solitario.armar().
+    Cada fila depende sólo de su semilla, no de cuántos mazos se generen
+    juntos. (Las mezclas no son las de crear_mazo con random.Random(semilla).)
+    Requiere numpy."""
+    if np is None:
+        raise ImportError("crear_mazos requiere numpy")
+    if palos not in _PALOS_MAZO:
+        raise ValueError("Cantidad de palos inválida: {}".format(palos))
+
+    base = np.array(_codigos_mazo(mazos, palos), dtype=np.uint8)
+    semillas = np.asarray(semillas, dtype=np.int64).astype(np.uint64).reshape(-1, 1)
+    posiciones = np.arange(len(base), dtype=np.uint64)
+    # Cada carta recibe una clave pseudoaleatoria que depende de la semilla
+    # y de su posición; ordenar las claves de cada fila da la permutación.
+    claves = splitmix64(splitmix64(semillas) ^ posiciones)
+    return base[np.argsort(claves, axis=1, kind='stable')]
+
+
+def splitmix64(x):
+    """Función de mezcla SplitMix64 aplicada a un arreglo de numpy de uint64."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _codigos_mazo(mazos, palos):
+    """Devuelve la lista de códigos (boca abajo) de los mazos sin mezclar."""
+    return [codificar(valor, palo) for _ in range(mazos) for palo in _PALOS_MAZO[palos] for valor in range(1, 14)]
@@ -1,4 +1,7 @@
 from pila_cartas import *
+from diario import Diario
+
+import sys
 
 # Constantes que describen las opciones de entrada del usuario.
 FUNDACION = 0
@@ -6,6 +9,18 @@ PILA_TABLERO = 1
 MAZO = 2
 DESCARTE = 3
 SALIR = 4
+DESHACER = 5
+REHACER = 6
+SUGERIR = 7
+
+# Letra de comando de cada tipo de pila u opción que no es FUNDACION (un
+# dígito) ni PILA_TABLERO (una letra desde la A) (ver Mesa.parsear_jugada).
+LETRAS = {MAZO: 'M', DESCARTE: 'N', SALIR: 'Q', DESHACER: 'U', REHACER: 'R', SUGERIR: '?'}
+
+# Multiplicadores (impares, de 64 bits) con los que se mezcla la huella de
+# cada pila según su lugar en la mesa antes de combinarlas.
+_MASCARA_64 = (1 << 64) - 1
+_MEZCLAS = [(0x9E3779B97F4A7C15 * (2 * i + 1)) & _MASCARA_64 for i in range(64)]
 
 
 class Mesa:
@@ -16,7 +31,9 @@ class Mesa:
             indicatas de la A a la N.
         mazo: PilaCartas. Representa al mazo. Todo solitario posee un mazo,
             aunque el mismo se encuentre vacío.
-        descarte: PilaCartas. Representa al descarte."""
+        descarte: PilaCartas. Representa al descarte.
+        diario: Diario o None. Registro de jugadas para deshacer y rehacer
+            (ver iniciar_diario)."""
 
     def __init__(self):
         """Crea una mesa vacía."""
@@ -24,21 +41,199 @@ class Mesa:
         self.pilas_tablero = []
         self.mazo = None
         self.descarte = None
+        self.diario = None
 
-    def imprimir(self):
-        """Imprime por pantalla una representación de la mesa actual."""
+        # Línea ya generada de cada pila: pila -> (pila.version, línea,
+        # glifos() con los que se generó), y líneas de la última impresión
+        # (ver imprimir).
+        self._lineas = {}
+        self._impresas = None
+
+    def imprimir(self, redibujar=False):
+        """Imprime por pantalla una representación de la mesa actual (ver
+        lineas()) en una sola escritura.
+        Si redibujar es True y la mesa ya se imprimió, en lugar de imprimirla
+        debajo se sobreescribe la impresión anterior con secuencias ANSI,
+        reescribiendo sólo las líneas que cambiaron. Sólo tiene sentido si
+        desde la impresión anterior no se escribió nada más en la terminal."""
+        lineas = self.lineas()
+        anteriores = self._impresas
+        if redibujar and anteriores is not None and len(anteriores) == len(lineas):
+            partes = ['\x1b[{}F'.format(len(lineas))]
+            for anterior, linea in zip(anteriores, lineas):
+                partes.append('\x1b[1E' if linea == anterior else '\x1b[2K' + linea + '\n')
+            texto = ''.join(partes)
+        else:
+            texto = '\n'.join(lineas) + '\n'
+        self._impresas = lineas
+        sys.stdout.write(texto)
+        sys.stdout.flush()
+
+    def lineas(self):
+        """Devuelve la lista de líneas que representan la mesa actual. El
+        texto de cada pila se guarda y sólo se vuelve a generar si la pila
+        cambió desde entonces (ver PilaCartas.version) o si se cambió la forma
+        de mostrar las cartas (ver carta.configurar_impresion)."""
+        lineas = []
         if self.fundaciones:
-            print("FUNDACIONES:")
+            lineas.append("FUNDACIONES:")
             for i,fundacion in enumerate(self.fundaciones):
-                print(i + 1, fundacion)
+                lineas.append(self._linea(str(i + 1), fundacion))
         if self.pilas_tablero:
-            print("TABLERO:")
+            lineas.append("TABLERO:")
             for i,pila in enumerate(self.pilas_tablero):
-                print(chr(ord('A')+i), pila)
-        print("MAZO")
-        print('M', self.mazo)
+                lineas.append(self._linea(chr(ord('A')+i), pila))
+        lineas.append("MAZO")
+        lineas.append(self._linea('M', self.mazo))
         if self.descarte:
-            print('N', self.descarte)
+            lineas.append(self._linea('N', self.descarte))
+        return lineas
+
+    def _linea(self, etiqueta, pila):
+        """Devuelve la línea de pila precedida por etiqueta, usando la que
+        se guardó si la pila no cambió."""
+        if pila is None:
+            return '{} {}'.format(etiqueta, pila)
+        guardada = self._lineas.get(pila)
+        if guardada is not None and guardada[0] == pila.version and guardada[2] is glifos():
+            return guardada[1]
+        linea = '{} {}'.format(etiqueta, pila)
+        self._lineas[pila] = (pila.version, linea, glifos())
+        return linea
+
+    def pilas(self):
+        """Devuelve la lista de todas las pilas de la mesa: fundaciones, pilas
+        del tablero, mazo y descarte (estos dos últimos si existen)."""
+        pilas = self.fundaciones + self.pilas_tablero
+        if self.mazo is not None:
+            pilas.append(self.mazo)
+        if self.descarte is not None:
+            pilas.append(self.descarte)
+        return pilas
+
+    def clonar(self):
+        """Devuelve una mesa con la misma configuración y contenido cuyas
+        pilas comparten las cartas con las de esta hasta que alguna de las
+        dos se modifique (ver PilaCartas.clonar), así que cuesta
+        O(cantidad de pilas). El clon no tiene diario. Para jugar sobre el
+        clon se crea un solitario de la misma variante con él."""
+        clon = Mesa()
+        clon.fundaciones = [pila.clonar() for pila in self.fundaciones]
+        clon.pilas_tablero = [pila.clonar() for pila in self.pilas_tablero]
+        if self.mazo is not None:
+            clon.mazo = self.mazo.clonar()
+        if self.descarte is not None:
+            clon.descarte = self.descarte.clonar()
+        return clon
+
+    def huella(self):
+        """Devuelve un hash de 64 bits del estado de la mesa: el contenido de
+        cada pila (incluyendo qué cartas están boca abajo) y su lugar en la
+        mesa. Cada pila mantiene su propia huella en O(1) por carta apilada o
+        desapilada, así que esto sólo combina una huella por pila."""
+        huella = 0
+        for i, pila in enumerate(self.pilas()):
+            huella ^= (pila.huella * _MEZCLAS[i]) & _MASCARA_64
+        return huella
+
+    def estado(self):
+        """Devuelve el contenido de todas las pilas (ver pilas()) como una
+        tupla de tuplas de códigos de carta."""
+        return tuple(tuple(pila.codigos) for pila in self.pilas())
+
+    def cargar_estado(self, estado):
+        """Vuelve las pilas de la mesa al contenido estado, obtenido con
+        estado() de una mesa con la misma configuración de pilas. Las
+        jugadas registradas en el diario (si lo hay) se olvidan."""
+        for pila, codigos in zip(self.pilas(), estado):
+            if tuple(pila.codigos) != codigos:
+                pila.reemplazar(codigos)
+        if self.diario is not None:
+            self.diario.olvidar()
+
+    def snapshot(self):
+        """Devuelve el contenido de la mesa codificado en bytes: la
+        configuración de pilas (ver _configuracion) y, por cada pila (ver
+        pilas()), su largo y los códigos de sus cartas, que ya indican si
+        están boca abajo. Las reglas de las pilas no se guardan: son las del
+        solitario que armó la mesa."""
+        datos = bytearray(self._configuracion())
+        for pila in self.pilas():
+            datos.append(len(pila.codigos))
+            datos += bytes(pila.codigos)
+        return bytes(datos)
+
+    def restore(self, buf):
+        """Vuelve las pilas de la mesa (armada por el mismo solitario) al
+        contenido buf obtenido con snapshot(). buf puede ser cualquier objeto
+        con protocolo de buffer (bytes, bytearray, memoryview, mmap) y no se
+        copia. Levanta ValueError si buf no corresponde a la configuración de
+        pilas de la mesa o no es un snapshot válido; en ese caso la mesa no
+        se modifica. Las jugadas registradas en el diario (si lo hay) se
+        olvidan."""
+        datos = memoryview(buf)
+        configuracion = self._configuracion()
+        i = len(configuracion)
+        if datos[:i] != configuracion:
+            raise ValueError("El snapshot no corresponde a esta mesa")
+
+        # Se valida todo el snapshot antes de tocar ninguna pila.
+        pilas = self.pilas()
+        contenidos = []
+        for pila in pilas:
+            if i >= len(datos):
+                raise ValueError("Snapshot incompleto")
+            largo = datos[i]
+            codigos = datos[i + 1:i + 1 + largo]
+            if len(codigos) != largo:
+                raise ValueError("Snapshot incompleto")
+            if largo and max(codigos) >= CANT_CODIGOS:
+                raise ValueError("Snapshot con códigos de carta inválidos")
+            contenidos.append(codigos)
+            i += 1 + largo
+        if i != len(datos):
+            raise ValueError("Snapshot con datos de más")
+
+        for pila, codigos in zip(pilas, contenidos):
+            if codigos != bytes(pila.codigos):
+                pila.reemplazar(codigos)
+        if self.diario is not None:
+            self.diario.olvidar()
+
+    def _configuracion(self):
+        """Devuelve los bytes que describen qué pilas tiene la mesa: cantidad
+        de fundaciones, cantidad de pilas del tablero y si hay mazo y
+        descarte."""
+        return bytes((len(self.fundaciones), len(self.pilas_tablero),
+                      (self.mazo is not None) | (self.descarte is not None) << 1))
+
+    def iniciar_diario(self):
+        """Empieza a registrar los cambios de todas las pilas de la mesa para
+        poder deshacer y rehacer jugadas. Debe llamarse una vez armada la mesa.
+        A partir de ahí, después de cada jugada hay que llamar a
+        confirmar_jugada() si tuvo éxito o a revertir_jugada() si falló."""
+        self.diario = Diario()
+        for pila in self.pilas():
+            pila.diario = self.diario
+
+    def confirmar_jugada(self):
+        """Cierra en el diario la jugada recién hecha."""
+        if self.diario is not None:
+            self.diario.cerrar_jugada()
+
+    def revertir_jugada(self):
+        """Deshace los cambios parciales de una jugada que no se completó."""
+        if self.diario is not None:
+            self.diario.anular_jugada()
+
+    def deshacer(self):
+        """Deshace la última jugada. Devuelve False si no había ninguna."""
+        return self.diario is not None and self.diario.deshacer()
+
+    def rehacer(self):
+        """Rehace la última jugada deshecha. Devuelve False si no había
+        ninguna."""
+        return self.diario is not None and self.diario.rehacer()
 
     def mensaje_jugada(self):
         """Retorna el mensaje que debe mostrársele al usuario para el input
@@ -56,7 +251,10 @@ class Mesa:
         if self.descarte:
             msg += ' N'
 
-        msg += ' Q: '
+        if self.diario is not None:
+            msg += ' U R'
+
+        msg += ' ? Q: '
 
         return msg
 
@@ -64,7 +262,8 @@ class Mesa:
         """Dada la entrada inp del usuario se devuelven las acciones indicadas.
         En funcionamiento normal devuelve una lista de 1 o 2 elementos.
         Cada elemento es un par (PILA, índice) donde PILA es un valor entre
-        FUNDACION, MAZO, DESCARTE, PILA_TABLERO o SALIR. El índice es el índice
+        FUNDACION, MAZO, DESCARTE, PILA_TABLERO, SALIR, DESHACER (U),
+        REHACER (R) o SUGERIR (?). El índice es el índice
         de la FUNDACION o de la PILA_TABLERO de corresponder o 0 si no.
         En caso de falla devuelve None."""
         inp = inp.upper()
@@ -82,9 +281,29 @@ class Mesa:
                 jugada.append((DESCARTE, 0))
             elif c == 'Q':
                 jugada.append((SALIR, 0))
+            elif self.diario is not None and c == 'U':
+                jugada.append((DESHACER, 0))
+            elif self.diario is not None and c == 'R':
+                jugada.append((REHACER, 0))
+            elif c == '?':
+                jugada.append((SUGERIR, 0))
             elif c >= 'A' and c < chr(ord('A') + len(self.pilas_tablero)):
                 jugada.append((PILA_TABLERO, ord(c) - ord('A')))
             else:
                 return None
         return jugada
 
+    @staticmethod
+    def formatear_jugada(jugada):
+        """Devuelve la entrada del usuario que corresponde a jugada (la
+        inversa de parsear_jugada). No depende de la mesa, así que puede
+        llamarse como Mesa.formatear_jugada(jugada)."""
+        entrada = ''
+        for pila, indice in jugada:
+            if pila == FUNDACION:
+                entrada += str(indice + 1)
+            elif pila == PILA_TABLERO:
+                entrada += chr(ord('A') + indice)
+            else:
+                entrada += LETRAS[pila]
+        return entrada
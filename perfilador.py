@@ -0,0 +1,156 @@
+from mesa import *
+
+import os, json, time, atexit
+
+# Variable de entorno que activa el perfilador (ver instalar_si_pedido). Si
+# su valor es '1' los resultados se guardan en SALIDA; si no, en el archivo
+# que indique.
+VARIABLE = 'SOLITARIO_PERFIL'
+SALIDA = 'perfil.json'
+
+# Nombres de las constantes de carta.criterio y de los tipos de pila de las
+# jugadas, para los informes.
+_PALOS = {MISMO_PALO: 'MISMO_PALO', MISMO_COLOR: 'MISMO_COLOR', DISTINTO_COLOR: 'DISTINTO_COLOR', DISTINTO_PALO: 'DISTINTO_PALO'}
+_ORDENES = {ASCENDENTE: 'ASCENDENTE', DESCENDENTE: 'DESCENDENTE', CONSECUTIVA: 'CONSECUTIVA'}
+_PILAS = {FUNDACION: 'fundacion', PILA_TABLERO: 'tablero', MAZO: 'mazo', DESCARTE: 'descarte'}
+
+# Nombre -> [cantidad de llamadas, segundos acumulados].
+_LLAMADAS = {}
+
+# Tipo de jugada -> [cantidad, segundos acumulados, errores, histograma],
+# donde el histograma cuenta las jugadas por potencia de 2 de microsegundos.
+_JUGADAS = {}
+
+_instalado = False
+
+
+def instalar(solitarios, salida=SALIDA):
+    """Reemplaza los métodos a medir por versiones que cuentan llamadas y
+    tiempo acumulado: PilaCartas.apilar, desapilar y mover,
+    PilaCartas.puede_apilar (por separado según el criterio_apilar de la
+    pila), Mesa.imprimir y parsear_jugada y el jugar() de cada clase de
+    solitarios, que además registra un histograma de duración por tipo de
+    jugada. Al terminar el
+    programa los resultados se guardan como JSON en salida.
+    Mientras no se llame a esta función no hay ningún costo."""
+    global _instalado
+    if _instalado:
+        return
+    _instalado = True
+
+    for clase, metodo in ((PilaCartas, 'apilar'), (PilaCartas, 'desapilar'), (PilaCartas, 'mover'),
+                          (Mesa, 'imprimir'), (Mesa, 'parsear_jugada')):
+        setattr(clase, metodo, _medir(clase.__name__ + '.' + metodo, getattr(clase, metodo)))
+    PilaCartas.puede_apilar = _medir_puede_apilar(PilaCartas.puede_apilar)
+    for clase in solitarios:
+        clase.jugar = _medir_jugar(clase.__name__, clase.jugar)
+
+    atexit.register(guardar, salida)
+
+
+def instalar_si_pedido(solitarios, pedido=False):
+    """Llama a instalar() si pedido es True o si está definida la variable
+    de entorno VARIABLE."""
+    valor = os.environ.get(VARIABLE)
+    if pedido or valor:
+        instalar(solitarios, valor if valor and valor != '1' else SALIDA)
+
+
+def resultados():
+    """Devuelve un diccionario con lo medido hasta el momento:
+        llamadas: nombre -> {cantidad, segundos}.
+        jugadas: tipo de jugada -> {cantidad, segundos, errores,
+            histograma_us}, donde histograma_us indica, para cada potencia
+            de 2, cuántas jugadas tardaron menos que esa cantidad de
+            microsegundos pero no menos que la potencia anterior."""
+    return {
+        'llamadas': {nombre: {'cantidad': cantidad, 'segundos': segundos}
+                     for nombre, (cantidad, segundos) in sorted(_LLAMADAS.items())},
+        'jugadas': {tipo: {
+            'cantidad': cantidad,
+            'segundos': segundos,
+            'errores': errores,
+            'histograma_us': {str(1 << bits): veces for bits, veces in sorted(histograma.items())},
+        } for tipo, (cantidad, segundos, errores, histograma) in sorted(_JUGADAS.items())},
+    }
+
+
+def guardar(salida=SALIDA):
+    """Guarda resultados() como JSON en el archivo salida."""
+    with open(salida, 'w') as f:
+        json.dump(resultados(), f, indent=2)
+
+
+def _medir(nombre, funcion):
+    """Devuelve funcion envuelta para acumular sus llamadas en nombre."""
+    estadistica = _LLAMADAS.setdefault(nombre, [0, 0.0])
+
+    def medida(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            estadistica[0] += 1
+            estadistica[1] += time.perf_counter() - inicio
+    medida.__wrapped__ = funcion
+    return medida
+
+
+def _medir_puede_apilar(puede_apilar):
+    """Devuelve PilaCartas.puede_apilar envuelta para acumular cada llamada
+    según el criterio_apilar de la pila (ver _nombre_puede_apilar). Se
+    cuentan todas las llamadas, también las que no llegan a comparar cartas
+    (pila vacía o tope boca abajo); los usos de criterio_mover no pasan por
+    aquí."""
+    def medida(pila, carta):
+        inicio = time.perf_counter()
+        try:
+            return puede_apilar(pila, carta)
+        finally:
+            nombre = _nombre_puede_apilar(pila.criterio_apilar)
+            estadistica = _LLAMADAS.get(nombre) or _LLAMADAS.setdefault(nombre, [0, 0.0])
+            estadistica[0] += 1
+            estadistica[1] += time.perf_counter() - inicio
+    medida.__wrapped__ = puede_apilar
+    return medida
+
+
+def _nombre_puede_apilar(comp):
+    """Devuelve el nombre con el que se informan las llamadas a
+    PilaCartas.puede_apilar de las pilas cuyo criterio_apilar es comp."""
+    if comp is None:
+        regla = 'sin criterio'
+    elif getattr(comp, 'clave', None) is None:
+        regla = getattr(comp, '__name__', str(comp))
+    else:
+        palo, orden = comp.clave
+        regla = 'criterio(palo={}, orden={})'.format(_PALOS.get(palo), _ORDENES.get(orden))
+    return 'PilaCartas.puede_apilar[{}]'.format(regla)
+
+
+def _medir_jugar(nombre, jugar):
+    """Devuelve el jugar() de un solitario envuelto para acumular sus
+    llamadas y la duración de cada jugada según su tipo."""
+    estadistica = _LLAMADAS.setdefault(nombre + '.jugar', [0, 0.0])
+
+    def medida(solitario, jugada):
+        inicio = time.perf_counter()
+        error = False
+        try:
+            return jugar(solitario, jugada)
+        except SolitarioError:
+            error = True
+            raise
+        finally:
+            segundos = time.perf_counter() - inicio
+            estadistica[0] += 1
+            estadistica[1] += segundos
+            tipo = nombre + ' ' + '→'.join(_PILAS.get(pila, str(pila)) for pila, _ in jugada)
+            jugadas = _JUGADAS.get(tipo) or _JUGADAS.setdefault(tipo, [0, 0.0, 0, {}])
+            jugadas[0] += 1
+            jugadas[1] += segundos
+            jugadas[2] += error
+            bits = int(segundos * 1e6).bit_length()
+            jugadas[3][bits] = jugadas[3].get(bits, 0) + 1
+    medida.__wrapped__ = jugar
+    return medida
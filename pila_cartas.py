@@ -1,4 +1,5 @@
 from carta import *
+import random
 
 class SolitarioError(Exception):
     """Tipo de Exception para todos los errores del Solitario."""
@@ -6,8 +7,33 @@ class SolitarioError(Exception):
     pass
 
 
+# Claves de Zobrist: _ZOBRIST[altura][codigo] es un entero de 64 bits al azar
+# (pero siempre el mismo) que representa a la carta codigo en esa altura.
+_ZOBRIST = []
+_AZAR_ZOBRIST = random.Random(0x50717a)
+
+def _claves_zobrist(altura):
+    """Devuelve las claves de Zobrist de una altura, generándolas si hace falta."""
+    while len(_ZOBRIST) <= altura:
+        _ZOBRIST.append(tuple(_AZAR_ZOBRIST.getrandbits(64) for _ in range(CANT_CODIGOS)))
+    return _ZOBRIST[altura]
+
+
 class PilaCartas:
-    """Representa una pila de cartas en el tablero."""
+    """Representa una pila de cartas en el tablero.
+    Las cartas se guardan en el atributo codigos, una lista con los códigos
+    (ver carta.codificar) de base a tope. En paralelo se lleva, para cada
+    posición, el largo de la corrida movible (ver criterio_mover) que
+    termina en esa carta, de modo que cantidad_movible() sea O(1).
+    El atributo version se incrementa con cada modificación de la pila y
+    permite invalidar resultados calculados sobre ella.
+    El atributo huella es un hash de Zobrist de 64 bits del contenido de la
+    pila (cartas, posiciones y si están boca abajo) que se actualiza con
+    cada carta que se agrega o se quita.
+    Si el atributo diario no es None, cada carta que se agrega o se quita se
+    registra en él (ver diario.Diario).
+    Una pila y sus clones (ver clonar) comparten las listas de cartas hasta
+    que alguno de ellos se modifica, y recién ahí ese lado las copia."""
 
     def __init__(self, pila_visible=False, valor_inicial=None, puede_desapilar=True, criterio_apilar=None, criterio_mover=None):
         """Se construye una pila vacía. El comportamiento estará regido por:
@@ -26,41 +52,245 @@ class PilaCartas:
         Todos los parámetros son optativos y tienen valores por omisión. En
         el caso de los parámetros que sean None, los mismos no se
         considerarán como restricciones (por ejemplo, si valor_inicial == None
-        se desactivará el chequeo de valor_inicial)."""
-        pass
+        se desactivará el chequeo de valor_inicial). Si criterio_mover es
+        None sólo puede moverse la carta del tope."""
+        self.pila_visible = pila_visible
+        self.valor_inicial = valor_inicial
+        self.puede_desapilar = puede_desapilar
+        self.criterio_apilar = criterio_apilar
+        self.criterio_mover = criterio_mover
+        self.codigos = []
+        self._corridas = []
+        self.version = 0
+        self.huella = 0
+        self.diario = None
+
+        # Si codigos y _corridas pueden estar compartidas con un clon.
+        self._compartida = False
+
+        # Resultados de cantidad_a_mover por pila de origen:
+        # origen -> (self.version, origen.version, cantidad).
+        self._cache_mover = {}
+
+        # Tablas precalculadas de los criterios (ver carta.criterio), si las hay.
+        self._tabla_apilar = getattr(criterio_apilar, 'tabla', None)
+        self._tabla_mover = getattr(criterio_mover, 'tabla', None)
 
     def es_vacia(self):
         """Indica si la pila se encuentra vacía."""
-        pass
+        return not self.codigos
 
     def tope(self):
         """Devuelve la carta tope de la pila.
         Levanta SolitarioError en caso de error."""
-        pass
+        if not self.codigos:
+            raise SolitarioError("La pila está vacía")
+        return carta_de(self.codigos[-1])
 
     def apilar(self, carta, forzar=False):
         """Apila una carta en la pila. Si forzar es True desactiva los chequeos
         sobre el valor_inicial y el criterio_apilar.
         Levanta SolitarioError en caso de no poder apilar."""
-        pass
+        if not forzar and not self.puede_apilar(carta):
+            raise SolitarioError("No se puede apilar {} sobre la pila".format(carta))
+        self._agregar(carta.codigo)
 
     def desapilar(self):
         """Desapila una carta. Levanta SolitarioError en caso de no poder
         desapilar."""
-        pass
+        if not self.puede_desapilar:
+            raise SolitarioError("No se puede desapilar de esta pila")
+        if not self.codigos:
+            raise SolitarioError("La pila está vacía")
+        codigo = self.codigos[-1]
+        self._quitar(1)
+        return carta_de(codigo)
+
+    def voltear(self):
+        """Da vuelta la carta del tope de la pila.
+        Levanta SolitarioError si la pila está vacía."""
+        if not self.codigos:
+            raise SolitarioError("La pila está vacía")
+        codigo = self.codigos[-1]
+        self._quitar(1)
+        self._agregar(voltear_codigo(codigo))
 
     def mover(self, origen):
         """Siendo origen otra PilaCartas intenta mover un subpilón de cartas
         de origen sobre la pila.
         Las primera carta que se apile sobre la pila debe validar
         criterio_apilar mientras que la cantidad de cartas máxima a mover
-        desde origen dependerá de criterio_mover.
+        desde origen dependerá de criterio_mover: el de origen limita el
+        bloque y, si la pila no tiene criterio_mover, sólo puede recibir la
+        carta del tope.
         Independientemente del criterio_mover no podrán moverse cartas que se
         encuentren boca abajo y sobre una carta boca abajo puede apilarse
         cualquier valor.
         Debe levantarse SolitarioError en caso de no poder mover ninguna carta
         de origen a la pila."""
-        pass
+        if not origen.puede_desapilar:
+            raise SolitarioError("No se puede desapilar de esta pila")
+
+        n = self.cantidad_a_mover(origen)
+        if not n:
+            raise SolitarioError("No se puede mover ninguna carta a la pila")
+
+        for codigo in origen.codigos[-n:]:
+            self._agregar(codigo)
+        origen._quitar(n)
+
+    def puede_apilar(self, carta):
+        """Indica si carta puede apilarse sobre la pila según valor_inicial y
+        criterio_apilar (es decir, si apilar(carta) no fallaría)."""
+        if not self.codigos:
+            return self.valor_inicial is None or carta.valor == self.valor_inicial
+        tope = self.codigos[-1]
+        if tope >= BOCA_ABAJO or self.criterio_apilar is None:
+            return True
+        if self._tabla_apilar is not None:
+            return self._tabla_apilar[tope * CANT_CODIGOS + carta.codigo]
+        return self.criterio_apilar(carta_de(tope), carta)
+
+    def cantidad_a_mover(self, origen):
+        """Devuelve cuántas cartas movería mover(origen), o 0 si no puede
+        moverse ninguna. El resultado se recuerda hasta que cambie alguna de
+        las dos pilas."""
+        guardado = self._cache_mover.get(origen)
+        if guardado and guardado[0] == self.version and guardado[1] == origen.version:
+            return guardado[2]
+
+        # Probamos desde el bloque más grande posible hasta la carta del tope.
+        # Una pila sin criterio_mover no recibe bloques.
+        maximo = origen.cantidad_movible()
+        if self.criterio_mover is None:
+            maximo = min(maximo, 1)
+        cantidad = 0
+        for n in range(maximo, 0, -1):
+            if self.puede_apilar(carta_de(origen.codigos[-n])):
+                cantidad = n
+                break
+        self._cache_mover[origen] = (self.version, origen.version, cantidad)
+        return cantidad
+
+    def cantidad_movible(self):
+        """Devuelve cuántas cartas del tope pueden moverse en bloque: las
+        que están boca arriba y cumplen criterio_mover de a pares (o sólo la
+        del tope si no hay criterio_mover). Vale 0 si la pila está vacía o
+        el tope está boca abajo."""
+        return self._corridas[-1] if self._corridas else 0
+
+    def reemplazar(self, codigos):
+        """Reemplaza el contenido de la pila por las cartas de la lista de
+        códigos codigos (de base a tope), sin chequear ninguna regla."""
+        if self.codigos:
+            self._quitar(len(self.codigos))
+        self.extender(codigos)
+
+    def extender(self, codigos):
+        """Agrega de una vez las cartas de la secuencia de códigos codigos
+        (de base a tope) sin chequear ninguna regla."""
+        if self._compartida:
+            self._separar()
+        pila = self.codigos
+        corridas = self._corridas
+        tabla = self._tabla_mover
+        huella = self.huella
+        for codigo in codigos:
+            if codigo >= BOCA_ABAJO:
+                corrida = 0
+            elif not pila or self.criterio_mover is None:
+                corrida = 1
+            elif tabla is not None:
+                corrida = corridas[-1] + 1 if tabla[pila[-1] * CANT_CODIGOS + codigo] else 1
+            else:
+                corrida = corridas[-1] + 1 if self.criterio_mover(carta_de(pila[-1]), carta_de(codigo)) else 1
+            huella ^= _claves_zobrist(len(pila))[codigo]
+            pila.append(codigo)
+            corridas.append(corrida)
+            if self.diario is not None:
+                self.diario.agregado(self, codigo)
+        self.huella = huella
+        self.version += 1
+
+    def repartir(self, origen, n, boca_arriba=None, tope_boca_arriba=False):
+        """Pasa de una vez las n cartas del tope de origen a la pila, igual
+        que si se desapilaran y apilaran (forzando) de a una: quedan en orden
+        inverso y la última repartida es el nuevo tope.
+            boca_arriba: None deja las cartas como estaban; True o False las
+                pone todas boca arriba o boca abajo; una secuencia de n bools
+                indica para cada carta, en el orden en que se reparten, si
+                queda boca arriba.
+            tope_boca_arriba: Si es True la última carta repartida queda
+                boca arriba.
+        Levanta SolitarioError si origen no tiene n cartas o si boca_arriba
+        es una secuencia de largo distinto de n."""
+        if n > len(origen.codigos):
+            raise SolitarioError("No hay suficientes cartas para repartir")
+        if boca_arriba is not None and not isinstance(boca_arriba, bool) and len(boca_arriba) != n:
+            raise SolitarioError("Se indicó boca_arriba para {} cartas en lugar de {}".format(len(boca_arriba), n))
+        if not n:
+            return
+        codigos = origen.codigos[:-n - 1:-1]
+        if boca_arriba is True:
+            codigos = [codigo % BOCA_ABAJO for codigo in codigos]
+        elif boca_arriba is False:
+            codigos = [codigo % BOCA_ABAJO + BOCA_ABAJO for codigo in codigos]
+        elif boca_arriba is not None:
+            codigos = [codigo % BOCA_ABAJO + (0 if arriba else BOCA_ABAJO) for codigo, arriba in zip(codigos, boca_arriba)]
+        if tope_boca_arriba:
+            codigos[-1] %= BOCA_ABAJO
+        origen._quitar(n)
+        self.extender(codigos)
+
+    def _agregar(self, codigo):
+        """Agrega codigo al tope actualizando el largo de la corrida movible."""
+        if self._compartida:
+            self._separar()
+        if codigo >= BOCA_ABAJO:
+            corrida = 0
+        elif not self.codigos or self.criterio_mover is None:
+            corrida = 1
+        elif self._tabla_mover is not None:
+            corrida = self._corridas[-1] + 1 if self._tabla_mover[self.codigos[-1] * CANT_CODIGOS + codigo] else 1
+        else:
+            corrida = self._corridas[-1] + 1 if self.criterio_mover(carta_de(self.codigos[-1]), carta_de(codigo)) else 1
+        self.huella ^= _claves_zobrist(len(self.codigos))[codigo]
+        self.codigos.append(codigo)
+        self._corridas.append(corrida)
+        self.version += 1
+        if self.diario is not None:
+            self.diario.agregado(self, codigo)
+
+    def clonar(self):
+        """Devuelve una pila con las mismas reglas y cartas que comparte el
+        contenido con esta hasta que alguna de las dos se modifique, así que
+        cuesta O(1). El clon no tiene diario."""
+        clon = type(self).__new__(type(self))
+        clon.__dict__.update(self.__dict__)
+        clon.diario = None
+        clon._cache_mover = {}
+        self._compartida = clon._compartida = True
+        return clon
+
+    def _separar(self):
+        """Copia las listas compartidas con un clon antes de modificarlas."""
+        self.codigos = list(self.codigos)
+        self._corridas = list(self._corridas)
+        self._compartida = False
+
+    def _quitar(self, n):
+        """Quita las n cartas del tope."""
+        if self._compartida:
+            self._separar()
+        altura = len(self.codigos) - n
+        quitados = self.codigos[altura:]
+        for i, codigo in enumerate(quitados, altura):
+            self.huella ^= _ZOBRIST[i][codigo]
+        del self.codigos[altura:]
+        del self._corridas[altura:]
+        self.version += 1
+        if self.diario is not None:
+            self.diario.quitado(self, quitados)
 
     def __str__(self):
         """Devuelve una representación de la pila.
@@ -68,9 +298,13 @@ class PilaCartas:
         Si pila_visible == True se representará a la pila como todas las
         cartas de base a tope separadas por espacios. Si no sólo se
         representará según el tope."""
-        pass
+        if not self.codigos:
+            return 'X'
+        if self.pila_visible:
+            return render_pila(self.codigos)
+        return glifos()[self.codigos[-1]]
 
     def __repr__(self):
         """Ídem __str__."""
-        pass
+        return str(self)
 
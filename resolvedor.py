@@ -0,0 +1,66 @@
+import time
+
+# Veredictos posibles de un resolvedor.
+GANABLE = 'ganable'
+IMPOSIBLE = 'imposible'
+INDETERMINADO = 'indeterminado'
+
+
+def huella_canonica(mesa):
+    """Devuelve una huella de la posición que no depende del orden de las
+    pilas del tablero ni del de las fundaciones (que son intercambiables).
+    El descarte se incluye si la mesa lo tiene."""
+    huellas = (
+        tuple(sorted(pila.huella for pila in mesa.pilas_tablero)),
+        tuple(sorted(fundacion.huella for fundacion in mesa.fundaciones)),
+        mesa.mazo.huella,
+    )
+    if mesa.descarte is not None:
+        huellas += (mesa.descarte.huella,)
+    return hash(huellas)
+
+
+class Presupuesto:
+    """Lleva la cuenta de los nodos visitados por una búsqueda y avisa cuando
+    se agotó el límite de nodos o de tiempo (en segundos). Cualquiera de los
+    dos límites puede ser None."""
+
+    def __init__(self, nodos=None, tiempo=None):
+        """Crea un presupuesto de nodos y tiempo, que empieza a correr ahora."""
+        self.limite_nodos = nodos
+        self.inicio = time.perf_counter()
+        self.fin = self.inicio + tiempo if tiempo is not None else None
+        self.nodos = 0
+
+    def gastar(self):
+        """Cuenta un nodo más. Devuelve False si se agotó el presupuesto."""
+        self.nodos += 1
+        if self.limite_nodos is not None and self.nodos > self.limite_nodos:
+            return False
+        # Consultar el reloj es caro: lo hacemos cada 1024 nodos.
+        if self.fin is not None and not self.nodos & 1023:
+            return time.perf_counter() < self.fin
+        return True
+
+    def transcurrido(self):
+        """Devuelve los segundos transcurridos desde la creación."""
+        return time.perf_counter() - self.inicio
+
+
+class DiarioPropio:
+    """Administrador de contexto que instala un Diario nuevo en la mesa para
+    que una búsqueda haga y deshaga jugadas, y al salir devuelve a la mesa el
+    diario que tenía."""
+
+    def __init__(self, mesa):
+        self.mesa = mesa
+
+    def __enter__(self):
+        self.anterior = self.mesa.diario
+        self.mesa.iniciar_diario()
+        return self.mesa.diario
+
+    def __exit__(self, *excepcion):
+        self.mesa.diario = self.anterior
+        for pila in self.mesa.pilas():
+            pila.diario = self.anterior
@@ -0,0 +1,240 @@
+from solitario_clasico import *
+from resolvedor import *
+
+import sys, random
+
+
+def resolver(mesa, limite=200000, tiempo=None, podar=True):
+    """Decide si la partida de SolitarioClasico armada en mesa puede ganarse.
+    Hace una búsqueda en profundidad haciendo y deshaciendo jugadas sobre la
+    propia mesa, que al terminar queda como estaba. Las posiciones ya vistas
+    se recuerdan en una tabla de transposición (lo que también corta los
+    ciclos del mazo) y pasar cartas del mazo se trata como una única jugada
+    que avanza hasta la próxima carta del descarte que pueda jugarse.
+        limite: Cantidad máxima de posiciones a visitar (o None).
+        tiempo: Cantidad máxima de segundos a usar (o None).
+        podar: Si es True se descartan los movimientos del tablero que no
+            parecen útiles (ver _jugadas_ordenadas). La búsqueda es mucho
+            más chica, pero si agota las posiciones sin ganar tras haber
+            descartado alguno el veredicto es INDETERMINADO: sólo sin podar
+            se llega a IMPOSIBLE en esos casos.
+    Devuelve una tupla (veredicto, jugadas, nodos): veredicto es GANABLE,
+    IMPOSIBLE o INDETERMINADO (si se agotó el límite), jugadas es la lista
+    de jugadas ganadora en el formato de Mesa.parsear_jugada (o None) y nodos
+    la cantidad de posiciones visitadas."""
+    solitario = SolitarioClasico(mesa)
+    presupuesto = Presupuesto(limite, tiempo)
+
+    with DiarioPropio(mesa):
+        camino = []
+        visitados = {huella_canonica(mesa)}
+        jugadas, podo = _jugadas_ordenadas(solitario, podar)
+        candidatas = [iter(jugadas)]
+        veredicto = IMPOSIBLE
+
+        if solitario.termino():
+            veredicto = GANABLE
+            candidatas = []
+
+        while candidatas:
+            jugada = next(candidatas[-1], None)
+            if jugada is None:
+                # No quedan alternativas en esta posición: volvemos atrás.
+                candidatas.pop()
+                if camino:
+                    camino.pop()
+                    mesa.deshacer()
+                continue
+
+            if jugada[0][0] == MAZO:
+                pasadas = _pasar_mazo(solitario)
+                if not pasadas:
+                    mesa.revertir_jugada()
+                    continue
+                paso = [jugada] * pasadas
+            else:
+                solitario.jugar(jugada)
+                paso = [jugada]
+            mesa.confirmar_jugada()
+
+            huella = huella_canonica(mesa)
+            if huella in visitados:
+                # Posición ya explorada (o ciclo del mazo): la salteamos.
+                mesa.deshacer()
+                continue
+            visitados.add(huella)
+            camino.append(paso)
+
+            if solitario.termino():
+                veredicto = GANABLE
+                break
+            if not presupuesto.gastar():
+                veredicto = INDETERMINADO
+                break
+            jugadas, podadas = _jugadas_ordenadas(solitario, podar)
+            podo = podo or podadas
+            candidatas.append(iter(jugadas))
+
+        if veredicto == IMPOSIBLE and podo:
+            veredicto = INDETERMINADO
+
+        solucion = [jugada for paso in camino for jugada in paso] if veredicto == GANABLE else None
+        for _ in camino:
+            mesa.deshacer()
+
+    return veredicto, solucion, presupuesto.nodos
+
+
+def _jugadas_ordenadas(solitario, podar=True):
+    """Devuelve las jugadas a probar ordenadas de más a menos prometedora:
+    primero las que suben cartas a las fundaciones, luego las que destapan
+    cartas boca abajo o vacían una pila, luego las del descarte, luego el
+    resto y por último el mazo.
+    Si alguna carta puede subirse a la fundación sin riesgo (ver
+    _a_fundacion_segura) esa es la única jugada que se devuelve. Con podar
+    se descartan además los movimientos entre pilas del tablero que no
+    destapan ni vacían nada y dejan en el tope una carta que no tiene ningún
+    uso inmediato: casi siempre sólo agrandan la búsqueda, pero no hay
+    garantía de que nunca hagan falta para ganar.
+    Devuelve (jugadas, podadas), donde podadas indica si se descartó alguna
+    jugada por esa poda."""
+    mesa = solitario.mesa
+    jugadas = solitario.jugadas_validas()
+    topes = _topes_fundaciones(mesa)
+
+    ordenadas = []
+    podadas = False
+    for jugada in jugadas:
+        (j0, p0), (j1, p1) = jugada[0], jugada[-1]
+        if len(jugada) == 2 and j1 == FUNDACION:
+            origen = mesa.descarte if j0 == DESCARTE else mesa.pilas_tablero[p0]
+            if _a_fundacion_segura(origen.tope(), topes):
+                return [jugada], False
+            prioridad = 0
+        elif j0 == PILA_TABLERO:
+            origen = mesa.pilas_tablero[p0]
+            destino = mesa.pilas_tablero[p1]
+            debajo = len(origen.codigos) - destino.cantidad_a_mover(origen)
+            if not debajo:
+                if destino.es_vacia():
+                    continue
+                prioridad = 1
+            elif origen.codigos[debajo - 1] >= BOCA_ABAJO:
+                prioridad = 1
+            elif not podar or _tiene_uso(mesa, carta_de(origen.codigos[debajo - 1]), origen):
+                prioridad = 3
+            else:
+                podadas = True
+                continue
+        elif j0 == DESCARTE:
+            prioridad = 2
+        else:
+            prioridad = 4
+        ordenadas.append((prioridad, jugada))
+    ordenadas.sort(key=lambda par: par[0])
+    return [jugada for _, jugada in ordenadas], podadas
+
+
+def _pasar_mazo(solitario):
+    """Pasa cartas del mazo al descarte (dando vuelta el mazo si hace falta)
+    hasta que el tope del descarte pueda jugarse en alguna pila. Como pasar
+    cartas no afecta al resto de la mesa, las posiciones intermedias no
+    aportan nada a la búsqueda. Devuelve la cantidad de veces que se jugó
+    MAZO, o 0 (sin jugar nada) si en toda una vuelta no aparece una carta
+    jugable."""
+    mesa = solitario.mesa
+    mazo, descarte = mesa.mazo.codigos, mesa.descarte.codigos
+    destinos = mesa.fundaciones + mesa.pilas_tablero
+
+    # Cartas que irían quedando en el tope del descarte con cada pasada: las
+    # del mazo desde el tope, luego (tras darlo vuelta) las del descarte
+    # desde la base.
+    pasadas = 0
+    for pasadas, codigo in _topes_del_descarte(mazo, descarte):
+        carta = carta_de(voltear_codigo(codigo) if codigo >= BOCA_ABAJO else codigo)
+        if any(pila.puede_apilar(carta) for pila in destinos):
+            break
+    else:
+        return 0
+
+    for _ in range(pasadas):
+        solitario.jugar([(MAZO, 0)])
+    return pasadas
+
+
+def _topes_del_descarte(mazo, descarte):
+    """Genera los pares (pasadas, codigo) con la carta que queda en el tope
+    del descarte después de jugar MAZO esa cantidad de veces, durante una
+    vuelta completa del mazo."""
+    for i in range(len(mazo)):
+        yield i + 1, mazo[-1 - i]
+    recorrido = descarte + mazo[::-1]
+    for i in range(len(descarte)):
+        yield len(mazo) + 2 + i, recorrido[i]
+
+
+def _topes_fundaciones(mesa):
+    """Devuelve, para cada palo, el valor más alto que tiene en las
+    fundaciones (0 si ninguno)."""
+    topes = [0] * 4
+    for fundacion in mesa.fundaciones:
+        if not fundacion.es_vacia():
+            carta = fundacion.tope()
+            topes[carta.palo] = carta.valor
+    return topes
+
+
+def _a_fundacion_segura(carta, topes):
+    """Indica si subir carta a la fundación nunca puede empeorar la partida:
+    es así si ya están en las fundaciones las dos cartas de color distinto
+    y valor inmediato inferior (que son las únicas que podrían necesitar
+    apilarse sobre ella en el tablero)."""
+    if carta.valor <= 2:
+        return True
+    if carta.palo in (CORAZONES, DIAMANTES):
+        opuestos = (PICAS, TREBOLES)
+    else:
+        opuestos = (CORAZONES, DIAMANTES)
+    return all(topes[palo] >= carta.valor - 1 for palo in opuestos)
+
+
+def _tiene_uso(mesa, carta, origen):
+    """Indica si carta, de quedar en el tope de origen, podría subirse a una
+    fundación o recibir el tope del descarte o de otra pila del tablero."""
+    if any(fundacion.puede_apilar(carta) for fundacion in mesa.fundaciones):
+        return True
+    if not mesa.descarte.es_vacia() and origen.criterio_apilar(carta, mesa.descarte.tope()):
+        return True
+    for pila in mesa.pilas_tablero:
+        if pila is not origen:
+            for codigo in pila.codigos[len(pila.codigos) - pila.cantidad_movible():]:
+                if origen.criterio_apilar(carta, carta_de(codigo)):
+                    return True
+    return False
+
+
+def resolver_semilla(semilla, limite=200000, tiempo=None, podar=True):
+    """Arma la partida de la semilla dada (como lo hace main) y la resuelve.
+    Devuelve lo mismo que resolver()."""
+    random.seed(semilla)
+    mesa = Mesa()
+    SolitarioClasico(mesa).armar()
+    return resolver(mesa, limite, tiempo, podar)
+
+
+def main():
+    """Uso: resolver_clasico.py DESDE HASTA [LIMITE]
+    Clasifica las semillas del rango [DESDE, HASTA) e imprime, por cada una,
+    la semilla, el veredicto, la cantidad de jugadas y de nodos visitados."""
+    if len(sys.argv) not in (3, 4):
+        print(main.__doc__)
+        return
+    desde, hasta = int(sys.argv[1]), int(sys.argv[2])
+    limite = int(sys.argv[3]) if len(sys.argv) == 4 else 200000
+
+    for semilla in range(desde, hasta):
+        veredicto, jugadas, nodos = resolver_semilla(semilla, limite)
+        print(semilla, veredicto, len(jugadas) if jugadas else '-', nodos)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from solitario_eliminador import *
+from resolvedor import *
+
+import sys, random
+
+
+def resolver(mesa, limite=None, tiempo=None):
+    """Decide de forma exacta si la partida de SolitarioEliminador armada en
+    mesa puede ganarse. Como todas las cartas del tablero están boca arriba
+    la búsqueda no necesita tocar la mesa: trabaja sobre un estado compacto
+    formado por la altura de cada pila del tablero y el valor del tope de
+    cada fundación (las fundaciones con CONSECUTIVA no miran el palo), y
+    recuerda los estados ya descartados.
+    Toda solución sube las cartas de a una, así que todas tienen el mismo
+    largo (la cantidad de cartas del tablero) y la primera que se encuentra
+    es también la más corta.
+        limite: Cantidad máxima de estados a visitar (o None).
+        tiempo: Cantidad máxima de segundos a usar (o None).
+    Devuelve una tupla (veredicto, jugadas, nodos) como resolver_clasico.resolver."""
+    valores = [[carta_de(codigo).valor for codigo in pila.codigos] for pila in mesa.pilas_tablero]
+    alturas = [len(pila) for pila in valores]
+    topes = [fundacion.tope().valor if not fundacion.es_vacia() else 0 for fundacion in mesa.fundaciones]
+    presupuesto = Presupuesto(limite, tiempo)
+    perdidos = set()
+    camino = []
+
+    def buscar():
+        if not any(alturas):
+            return GANABLE
+        clave = _clave(alturas, topes)
+        if clave in perdidos:
+            return IMPOSIBLE
+        if not presupuesto.gastar():
+            return INDETERMINADO
+
+        for i, altura in enumerate(alturas):
+            if not altura:
+                continue
+            valor = valores[i][altura - 1]
+            probados = set()
+            for j, tope in enumerate(topes):
+                # Las fundaciones con el mismo tope son equivalentes.
+                if tope in probados or not _consecutivas(tope, valor):
+                    continue
+                probados.add(tope)
+
+                alturas[i] -= 1
+                topes[j] = valor
+                camino.append([(PILA_TABLERO, i), (FUNDACION, j)])
+                resultado = buscar()
+                if resultado != IMPOSIBLE:
+                    return resultado
+                camino.pop()
+                topes[j] = tope
+                alturas[i] += 1
+
+        perdidos.add(clave)
+        return IMPOSIBLE
+
+    veredicto = buscar()
+    return veredicto, camino if veredicto == GANABLE else None, presupuesto.nodos
+
+
+def _consecutivas(tope, valor):
+    """Indica si valor puede apilarse sobre una fundación con tope de ese
+    valor (0 si está vacía), según criterio(orden=CONSECUTIVA)."""
+    return not tope or tope % 13 + 1 == valor or valor % 13 + 1 == tope
+
+
+def _clave(alturas, topes):
+    """Codifica el estado en un entero: 4 bits por altura y por tope, con los
+    topes ordenados porque las fundaciones son intercambiables."""
+    clave = 0
+    for valor in alturas:
+        clave = clave << 4 | valor
+    for valor in sorted(topes):
+        clave = clave << 4 | valor
+    return clave
+
+
+def resolver_semilla(semilla, limite=None, tiempo=None):
+    """Arma la partida de la semilla dada (como lo hace main) y la resuelve.
+    Devuelve lo mismo que resolver()."""
+    random.seed(semilla)
+    mesa = Mesa()
+    SolitarioEliminador(mesa).armar()
+    return resolver(mesa, limite, tiempo)
+
+
+def main():
+    """Uso: resolver_eliminador.py DESDE HASTA
+    Resuelve las semillas del rango [DESDE, HASTA) e imprime, por cada una,
+    la semilla, el veredicto, la cantidad de jugadas y de estados visitados."""
+    if len(sys.argv) != 3:
+        print(main.__doc__)
+        return
+    desde, hasta = int(sys.argv[1]), int(sys.argv[2])
+
+    for semilla in range(desde, hasta):
+        veredicto, jugadas, nodos = resolver_semilla(semilla)
+        print(semilla, veredicto, len(jugadas) if jugadas else '-', nodos)
+
+if __name__ == "__main__":
+    main()
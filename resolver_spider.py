@@ -0,0 +1,148 @@
+from solitario_spider import *
+from resolvedor import *
+
+import sys, random, heapq, collections
+
+# Pesos de la evaluación de una posición (ver puntaje()).
+PESO_COMPLETAS = 1000
+PESO_BOCA_ABAJO = -20
+PESO_VACIAS = 40
+PESO_CORRIDAS = 5
+
+# Cantidad de capas de la búsqueda cuyas posiciones se recuerdan para no
+# volver a expandirlas.
+CAPAS_RECORDADAS = 8
+
+
+def resolver(mesa, ancho=200, limite=None, tiempo=None, max_jugadas=1000):
+    """Busca cómo ganar la partida de SolitarioSpider armada en mesa con una
+    búsqueda en haz: en cada paso se expanden sólo las ancho mejores
+    posiciones según puntaje(), así que la memoria usada no depende de
+    cuánto dure la búsqueda. Las jugadas se hacen y deshacen sobre la propia
+    mesa, que al terminar queda como estaba.
+        ancho: Cantidad de posiciones que se conservan en cada paso.
+        limite: Cantidad máxima de posiciones a generar (o None).
+        tiempo: Cantidad máxima de segundos a usar (o None).
+        max_jugadas: Largo máximo de la línea de juego.
+    Devuelve una tupla (veredicto, jugadas, estadisticas): veredicto es
+    GANABLE si encontró cómo ganar o INDETERMINADO si no (la búsqueda no es
+    exhaustiva); jugadas es la mejor línea encontrada, la ganadora o la que
+    llega a la posición de mayor puntaje, en el formato de
+    Mesa.parsear_jugada; estadisticas es un diccionario con nodos, segundos,
+    nodos_por_segundo, frontera_maxima (la mayor cantidad de posiciones
+    nuevas generadas en un paso) y puntaje (el de la mejor línea)."""
+    solitario = SolitarioSpider(mesa)
+    presupuesto = Presupuesto(limite, tiempo)
+    inicial = mesa.snapshot()
+
+    # Cada nodo es una tupla (puntaje, estado, camino), donde estado es el
+    # snapshot() de la mesa y camino es una lista enlazada (jugada, camino
+    # del padre) que comparten los hijos.
+    mejor = ganador = (puntaje(mesa), inicial, None)
+    if not solitario.termino():
+        ganador = None
+    frontera = [mejor]
+    frontera_maxima = 1
+    vistos = collections.deque([{huella_canonica(mesa)}], maxlen=CAPAS_RECORDADAS)
+
+    with DiarioPropio(mesa):
+        agotado = False
+        for _ in range(max_jugadas):
+            if ganador or agotado or not frontera:
+                break
+
+            capa = {}
+            for _, estado, camino in frontera:
+                mesa.restore(estado)
+                for jugada in solitario.jugadas_validas():
+                    solitario.jugar(jugada)
+                    mesa.confirmar_jugada()
+
+                    huella = huella_canonica(mesa)
+                    if huella not in capa and not any(huella in anteriores for anteriores in vistos):
+                        capa[huella] = nodo = (puntaje(mesa), mesa.snapshot(), (jugada, camino))
+                        if solitario.termino():
+                            ganador = nodo
+                    mesa.deshacer()
+
+                    agotado = not presupuesto.gastar()
+                    if ganador or agotado:
+                        break
+                if ganador or agotado:
+                    break
+
+            vistos.append(set(capa))
+            frontera = heapq.nlargest(ancho, capa.values(), key=lambda nodo: nodo[0])
+            frontera_maxima = max(frontera_maxima, len(capa))
+            if frontera and frontera[0][0] > mejor[0]:
+                mejor = frontera[0]
+
+        mesa.restore(inicial)
+
+    final = ganador or mejor
+    segundos = presupuesto.transcurrido()
+    estadisticas = {
+        'nodos': presupuesto.nodos,
+        'segundos': segundos,
+        'nodos_por_segundo': presupuesto.nodos / segundos if segundos else 0,
+        'frontera_maxima': frontera_maxima,
+        'puntaje': final[0],
+    }
+    return GANABLE if ganador else INDETERMINADO, _jugadas(final[2]), estadisticas
+
+
+def puntaje(mesa):
+    """Evalúa una posición de SolitarioSpider: premia las escaleras ya
+    subidas a las fundaciones, las pilas vacías y el largo de las corridas
+    movibles de cada tope, y castiga las cartas que siguen boca abajo."""
+    completas = sum(1 for fundacion in mesa.fundaciones if not fundacion.es_vacia())
+    boca_abajo = vacias = corridas = 0
+    for pila in mesa.pilas_tablero:
+        if pila.es_vacia():
+            vacias += 1
+        else:
+            boca_abajo += sum(1 for codigo in pila.codigos if codigo >= BOCA_ABAJO)
+            corridas += pila.cantidad_movible()
+    return (PESO_COMPLETAS * completas + PESO_BOCA_ABAJO * boca_abajo
+            + PESO_VACIAS * vacias + PESO_CORRIDAS * corridas)
+
+
+def _jugadas(camino):
+    """Convierte la lista enlazada camino en la lista de jugadas desde el
+    inicio."""
+    jugadas = []
+    while camino:
+        jugada, camino = camino
+        jugadas.append(jugada)
+    jugadas.reverse()
+    return jugadas
+
+
+def resolver_semilla(semilla, ancho=200, limite=None, tiempo=None):
+    """Arma la partida de la semilla dada (como lo hace main) y la resuelve.
+    Devuelve lo mismo que resolver()."""
+    random.seed(semilla)
+    mesa = Mesa()
+    SolitarioSpider(mesa).armar()
+    return resolver(mesa, ancho, limite, tiempo)
+
+
+def main():
+    """Uso: resolver_spider.py SEMILLA [ANCHO [LIMITE]]
+    Busca cómo ganar la partida de la semilla dada e imprime el veredicto,
+    las estadísticas de la búsqueda y la mejor línea encontrada."""
+    if len(sys.argv) not in (2, 3, 4):
+        print(main.__doc__)
+        return
+    semilla = int(sys.argv[1])
+    ancho = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    limite = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    veredicto, jugadas, estadisticas = resolver_semilla(semilla, ancho, limite)
+    print(veredicto, len(jugadas), 'jugadas')
+    for clave, valor in estadisticas.items():
+        print(clave, valor)
+    print(jugadas)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+from main import SOLITARIOS, CADA_CHECKPOINT, CHECKPOINT, crear_solitario, ejecutar, reproducir_log, recuperar, foto_mesa, loguear
+from mesa import *
+
+import os, re, random, asyncio, secrets, argparse
+
+# Protocolo: el cliente manda líneas de texto. La primera abre la sesión:
+#     NUEVO <juego> [semilla] [-diff]
+#     RETOMAR <id> [-diff]        (sólo si el servidor guarda logs)
+# y las siguientes son comandos con la sintaxis de Mesa.parsear_jugada (Q
+# cierra la sesión). Cada respuesta es una línea de estado:
+#     OK <n>, FIN <n> (el juego terminó) o ERROR <n> <mensaje>
+# donde n es la cantidad de líneas de la mesa (ver Mesa.lineas), seguida de
+# las líneas de la mesa y de una línea vacía. Con -diff sólo se mandan las
+# líneas que cambiaron desde la respuesta anterior, cada una precedida por
+# su número (desde 0) y un espacio. Las respuestas de ERROR no traen líneas.
+# La respuesta a NUEVO y RETOMAR va precedida de una línea SESION <id>.
+NUEVO = 'NUEVO'
+RETOMAR = 'RETOMAR'
+DIFF = '-diff'
+OK = 'OK'
+FIN = 'FIN'
+ERROR = 'ERROR'
+SESION = 'SESION'
+
+PUERTO = 7373
+
+# Conexiones pendientes de aceptar que admite el socket; el valor por omisión
+# de asyncio (100) no alcanza cuando muchos clientes se conectan a la vez.
+BACKLOG = 4096
+
+# Segundos sin recibir comandos tras los cuales se cierra una sesión. Si el
+# servidor guarda logs, la partida puede retomarse después con RETOMAR.
+INACTIVIDAD = 300
+
+_ID = re.compile(r'[0-9a-f]{16}$')
+
+
+class Sesion:
+    """Partida de un cliente del servidor. Como atributos posee:
+        id: str. Identificador de la sesión.
+        mesa: Mesa de la partida.
+        solitario: Solitario que se juega sobre mesa.
+        log: archivo o None. Log de la partida, en el formato de main.
+        desde_foto: int. Comandos registrados desde la última foto en el
+            log."""
+
+    def __init__(self, id, juego, semilla, ruta_log=None, tramos=None):
+        """Arma la partida de juego con la semilla. Si se dan los tramos de
+        un log (ver main.recuperar) se retoma la partida desde ellos. Si se
+        da ruta_log, los comandos se registran en ese archivo."""
+        self.id = id
+        self.mesa = Mesa()
+        self.solitario = crear_solitario(juego, self.mesa)
+        self.solitario.armar(random.Random(semilla))
+        self.mesa.iniciar_diario()
+        self.desde_foto = reproducir_log(self.mesa, self.solitario, tramos) if tramos else 0
+
+        self.log = None
+        if ruta_log:
+            self.log = open(ruta_log, 'a' if tramos else 'w')
+            if not tramos:
+                loguear(self.log, semilla)
+                loguear(self.log, juego)
+                self.log.flush()
+
+        # Líneas de la mesa mandadas en la última respuesta (ver respuesta).
+        self._lineas = None
+
+    def jugar(self, comando):
+        """Ejecuta el comando del cliente. Devuelve None si se pudo o el
+        mensaje de error si no."""
+        jugada = self.mesa.parsear_jugada(comando)
+        if not jugada:
+            return "Comando incorrecto"
+        if jugada[0][0] == SUGERIR:
+            return "Las sugerencias no están disponibles en el servidor"
+
+        loguear(self.log, comando)
+        error = None
+        try:
+            ejecutar(self.mesa, self.solitario, jugada)
+        except SolitarioError as e:
+            error = str(e)
+
+        self.desde_foto += 1
+        if self.log:
+            if self.desde_foto >= CADA_CHECKPOINT:
+                loguear(self.log, CHECKPOINT + foto_mesa(self.mesa))
+                self.desde_foto = 0
+            # Si el servidor se cae, el log ya tiene todo lo jugado.
+            self.log.flush()
+        return error
+
+    def respuesta(self, error=None, diff=False):
+        """Devuelve el texto de la respuesta al último comando (ver el
+        protocolo al principio del módulo)."""
+        lineas = self.mesa.lineas()
+        if error is not None:
+            return '{} {} {}\n\n'.format(ERROR, len(lineas), error)
+
+        estado = FIN if self.solitario.termino() else OK
+        anteriores = self._lineas
+        self._lineas = lineas
+        if diff and anteriores is not None:
+            cambios = ['{} {}'.format(i, linea) for i, linea in enumerate(lineas)
+                       if i >= len(anteriores) or anteriores[i] != linea]
+        elif diff:
+            cambios = ['{} {}'.format(i, linea) for i, linea in enumerate(lineas)]
+        else:
+            cambios = lineas
+        return '{} {}\n{}\n'.format(estado, len(lineas), ''.join(linea + '\n' for linea in cambios))
+
+    def cerrar(self):
+        """Cierra el log de la sesión."""
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+class Servidor:
+    """Servidor asyncio de partidas: cada conexión es una sesión (ver
+    Sesion y el protocolo al principio del módulo). Como atributos posee:
+        logs: str o None. Directorio donde se guarda el log de cada sesión
+            (como <id>.log), o None para no guardarlos.
+        inactividad: float. Segundos sin comandos tras los que se cierra una
+            sesión.
+        sesiones: dict id -> Sesion de las sesiones abiertas."""
+
+    def __init__(self, logs=None, inactividad=INACTIVIDAD):
+        self.logs = logs
+        self.inactividad = inactividad
+        self.sesiones = {}
+
+    async def atender(self, reader, writer):
+        """Atiende la conexión de un cliente hasta que cierre la sesión, se
+        desconecte o supere el tiempo de inactividad."""
+        sesion = None
+        try:
+            linea = await self._leer(reader, writer)
+            if linea is None:
+                return
+            sesion, diff, error = self._abrir(linea.split())
+            if sesion is None:
+                writer.write('{} 0 {}\n\n'.format(ERROR, error).encode())
+                await writer.drain()
+                return
+            self.sesiones[sesion.id] = sesion
+            writer.write('{} {}\n{}'.format(SESION, sesion.id, sesion.respuesta(diff=diff)).encode())
+            await writer.drain()
+
+            while not sesion.solitario.termino():
+                comando = await self._leer(reader, writer)
+                if comando is None or comando.upper() == 'Q':
+                    break
+                error = sesion.jugar(comando)
+                writer.write(sesion.respuesta(error, diff).encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if sesion is not None:
+                self.sesiones.pop(sesion.id, None)
+                sesion.cerrar()
+            writer.close()
+
+    async def _leer(self, reader, writer):
+        """Devuelve la siguiente línea del cliente, o None si se desconectó o
+        no mandó nada en self.inactividad segundos (en ese caso se le avisa
+        antes de cerrar)."""
+        try:
+            linea = await asyncio.wait_for(reader.readline(), self.inactividad)
+        except asyncio.TimeoutError:
+            writer.write('{} 0 Sesión cerrada por inactividad\n\n'.format(ERROR).encode())
+            return None
+        if not linea:
+            return None
+        return linea.decode(errors='replace').strip()
+
+    def _abrir(self, palabras):
+        """Abre la sesión pedida en la primera línea del cliente. Devuelve
+        (sesion, diff, None), o (None, False, mensaje de error)."""
+        diff = DIFF in palabras
+        palabras = [palabra for palabra in palabras if palabra != DIFF]
+        if len(palabras) in (2, 3) and palabras[0].upper() == NUEVO:
+            juego = palabras[1]
+            if juego not in SOLITARIOS:
+                return None, False, "Juego desconocido: {}".format(juego)
+            try:
+                semilla = int(palabras[2]) if len(palabras) == 3 else random.getrandbits(31)
+            except ValueError:
+                return None, False, "Semilla inválida"
+            id = secrets.token_hex(8)
+            return Sesion(id, juego, semilla, self._ruta_log(id)), diff, None
+
+        if len(palabras) == 2 and palabras[0].upper() == RETOMAR:
+            id = palabras[1]
+            if not self.logs:
+                return None, False, "El servidor no guarda las sesiones"
+            if not _ID.match(id):
+                return None, False, "Sesión inválida: {}".format(id)
+            if id in self.sesiones:
+                return None, False, "La sesión {} está abierta".format(id)
+            try:
+                semilla, juego, tramos = recuperar(self._ruta_log(id))
+            except FileNotFoundError:
+                return None, False, "No existe la sesión {}".format(id)
+            except (IOError, ValueError) as e:
+                return None, False, "No pudo leerse el log de la sesión {}: {}".format(id, e)
+            if juego not in SOLITARIOS:
+                return None, False, "El log de la sesión {} es de un juego desconocido: {}".format(id, juego)
+            try:
+                return Sesion(id, juego, semilla, self._ruta_log(id), tramos), diff, None
+            except ValueError as e:
+                return None, False, "No pudo retomarse la sesión {}: {}".format(id, e)
+
+        return None, False, "Se esperaba {} <juego> [semilla] o {} <id>".format(NUEVO, RETOMAR)
+
+    def _ruta_log(self, id):
+        """Devuelve la ruta del log de la sesión id, o None si no se guardan."""
+        return os.path.join(self.logs, id + '.log') if self.logs else None
+
+
+async def servir(servidor, host='localhost', puerto=PUERTO, unix=None):
+    """Atiende conexiones con servidor por TCP en host y puerto o, si se da,
+    por el socket Unix de ruta unix, hasta que se cancele."""
+    if unix:
+        conexiones = await asyncio.start_unix_server(servidor.atender, unix, backlog=BACKLOG)
+    else:
+        conexiones = await asyncio.start_server(servidor.atender, host, puerto, backlog=BACKLOG)
+    async with conexiones:
+        await conexiones.serve_forever()
+
+
+async def leer_respuesta(reader):
+    """Lee una respuesta del servidor. Devuelve (estado, lineas) donde estado
+    es la lista de palabras de la línea de estado y lineas las líneas que
+    le siguen, o None si el servidor cerró la conexión."""
+    estado = await reader.readline()
+    if not estado:
+        return None
+    lineas = []
+    while True:
+        linea = (await reader.readline()).decode().rstrip('\n')
+        if not linea:
+            return estado.decode().split(), lineas
+        lineas.append(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sirve partidas de solitario a muchos clientes a la vez.")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('-p', '--puerto', type=int, default=PUERTO)
+    parser.add_argument('-u', '--unix', help="ruta de un socket Unix donde escuchar en lugar de TCP")
+    parser.add_argument('-l', '--logs', help="directorio donde guardar el log de cada sesión para poder retomarla")
+    parser.add_argument('-i', '--inactividad', type=float, default=INACTIVIDAD,
+                        help="segundos sin comandos tras los que se cierra una sesión")
+    args = parser.parse_args()
+
+    if args.logs:
+        os.makedirs(args.logs, exist_ok=True)
+    try:
+        asyncio.run(servir(Servidor(args.logs, args.inactividad), args.host, args.puerto, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from main import SOLITARIOS, crear_solitario
+from mesa import *
+import resolver_clasico, resolver_eliminador, resolver_spider, perfilador
+
+import sys, json, time, random, argparse, multiprocessing
+
+# Cantidad máxima de jugadas de una partida simulada antes de darla por perdida.
+MAX_JUGADAS = 1000
+
+# Límites que se le dan a los resolvedores en la política 'resolvedor'.
+LIMITE_RESOLVEDOR = 20000
+ANCHO_SPIDER = 50
+
+GANO = 'gano'
+PERDIO = 'perdio'
+
+
+def jugar_al_azar(juego, solitario, azar, max_jugadas):
+    """Juega eligiendo al azar entre las jugadas válidas. Devuelve la
+    cantidad de jugadas hechas."""
+    for n in range(max_jugadas):
+        if solitario.termino():
+            return n
+        jugadas = solitario.jugadas_validas()
+        if not jugadas:
+            return n
+        solitario.jugar(azar.choice(jugadas))
+    return max_jugadas
+
+
+def jugar_codicioso(juego, solitario, azar, max_jugadas):
+    """Juega eligiendo siempre la jugada que deja la mejor posición según
+    evaluar(), prefiriendo posiciones no visitadas y desempatando al azar.
+    Devuelve la cantidad de jugadas hechas."""
+    mesa = solitario.mesa
+    mesa.iniciar_diario()
+    vistas = {mesa.huella()}
+    for n in range(max_jugadas):
+        if solitario.termino():
+            return n
+        mejor, elegida = None, None
+        for jugada in solitario.jugadas_validas():
+            solitario.jugar(jugada)
+            mesa.confirmar_jugada()
+            clave = (mesa.huella() not in vistas, evaluar(mesa), azar.random())
+            mesa.deshacer()
+            if mejor is None or clave > mejor:
+                mejor, elegida = clave, jugada
+        if elegida is None:
+            return n
+        solitario.jugar(elegida)
+        mesa.confirmar_jugada()
+        vistas.add(mesa.huella())
+    return max_jugadas
+
+
+def jugar_con_resolvedor(juego, solitario, azar, max_jugadas):
+    """Juega la línea que encuentre el resolvedor de la variante (ver
+    RESOLVEDORES). Devuelve la cantidad de jugadas hechas."""
+    jugadas = RESOLVEDORES[juego](solitario.mesa) or []
+    for jugada in jugadas[:max_jugadas]:
+        solitario.jugar(jugada)
+    return min(len(jugadas), max_jugadas)
+
+
+def evaluar(mesa):
+    """Evaluación genérica de una posición: cartas en las fundaciones, cartas
+    boca abajo que quedan en el tablero y pilas del tablero vacías."""
+    fundaciones = sum(len(fundacion.codigos) for fundacion in mesa.fundaciones)
+    boca_abajo = sum(1 for pila in mesa.pilas_tablero for codigo in pila.codigos if codigo >= BOCA_ABAJO)
+    vacias = sum(1 for pila in mesa.pilas_tablero if pila.es_vacia())
+    return 10 * fundaciones - 5 * boca_abajo + 2 * vacias
+
+
+POLITICAS = {
+    'azar': jugar_al_azar,
+    'codicioso': jugar_codicioso,
+    'resolvedor': jugar_con_resolvedor,
+}
+
+# Para cada juego, función que dada una mesa armada devuelve la línea de
+# jugadas a seguir (o None).
+RESOLVEDORES = {
+    'Clasico': lambda mesa: resolver_clasico.resolver(mesa, LIMITE_RESOLVEDOR)[1],
+    'Eliminador': lambda mesa: resolver_eliminador.resolver(mesa, LIMITE_RESOLVEDOR)[1],
+    'Spider': lambda mesa: resolver_spider.resolver(mesa, ANCHO_SPIDER, LIMITE_RESOLVEDOR)[1],
+}
+
+
+def jugar_partida(juego, semilla, politica, max_jugadas=MAX_JUGADAS):
+    """Juega sin imprimir nada la partida de juego (ver SOLITARIOS) repartida
+    con la semilla dada, usando la política indicada (ver POLITICAS).
+    La partida usa su propio random.Random(semilla), tanto para repartir
+    (igual que main con esa semilla) como para la política, así que el
+    resultado sólo depende de los parámetros.
+    Devuelve un diccionario con semilla, resultado (GANO o PERDIO), jugadas
+    y segundos."""
+    inicio = time.perf_counter()
+    azar = random.Random(semilla)
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(azar)
+
+    jugadas = POLITICAS[politica](juego, solitario, azar, max_jugadas)
+    return {
+        'semilla': semilla,
+        'resultado': GANO if solitario.termino() else PERDIO,
+        'jugadas': jugadas,
+        'segundos': time.perf_counter() - inicio,
+    }
+
+
+def _jugar_partida(argumentos):
+    """Ídem jugar_partida, con los argumentos en una tupla (para Pool)."""
+    return jugar_partida(*argumentos)
+
+
+def simular(juego, semillas, politica, procesos=None, max_jugadas=MAX_JUGADAS, salida=sys.stdout):
+    """Juega una partida por cada semilla repartiéndolas entre procesos
+    procesos (todos los procesadores si es None; si es 1 no se crean
+    procesos). Escribe en salida una línea JSON por partida a medida que
+    terminan y al final una línea JSON {"resumen": ...}. Devuelve el resumen:
+    un diccionario con partidas, ganadas, tasa_victorias, segundos y
+    partidas_por_segundo."""
+    if politica == 'resolvedor' and juego not in RESOLVEDORES:
+        raise ValueError("No hay resolvedor para {}".format(juego))
+
+    inicio = time.perf_counter()
+    tareas = [(juego, semilla, politica, max_jugadas) for semilla in semillas]
+    partidas = ganadas = 0
+
+    if procesos == 1:
+        resultados = map(_jugar_partida, tareas)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(procesos)
+        resultados = pool.imap_unordered(_jugar_partida, tareas, chunksize=max(1, len(tareas) // 256))
+
+    try:
+        for resultado in resultados:
+            partidas += 1
+            ganadas += resultado['resultado'] == GANO
+            salida.write(json.dumps(resultado) + '\n')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    segundos = time.perf_counter() - inicio
+    resumen = {
+        'juego': juego,
+        'politica': politica,
+        'partidas': partidas,
+        'ganadas': ganadas,
+        'tasa_victorias': ganadas / partidas if partidas else 0,
+        'segundos': segundos,
+        'partidas_por_segundo': partidas / segundos if segundos else 0,
+    }
+    salida.write(json.dumps({'resumen': resumen}) + '\n')
+    salida.flush()
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula partidas de solitario sin interfaz.")
+    parser.add_argument('juego', choices=sorted(SOLITARIOS))
+    parser.add_argument('desde', type=int, help="primera semilla")
+    parser.add_argument('hasta', type=int, help="semilla final (no incluida)")
+    parser.add_argument('-p', '--politica', choices=sorted(POLITICAS), default='azar')
+    parser.add_argument('-j', '--procesos', type=int, default=None, help="procesos a usar (por omisión, todos los procesadores)")
+    parser.add_argument('-m', '--max-jugadas', type=int, default=MAX_JUGADAS)
+    args = parser.parse_args()
+
+    # Con la variable de entorno perfilador.VARIABLE se miden las partes
+    # críticas del motor (sólo las partidas jugadas en este proceso: -j 1).
+    perfilador.instalar_si_pedido([clase for clase, _ in SOLITARIOS.values()])
+    simular(args.juego, range(args.desde, args.hasta), args.politica, args.procesos, args.max_jugadas)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+from main import crear_solitario
+from mazo import crear_mazos, splitmix64
+from mesa import *
+from simulador import GANO, PERDIO, MAX_JUGADAS
+
+import sys, json, time, argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Juegos que puede jugar el MotorVectorial: aquellos cuyas jugadas son todas
+# mover la carta del tope de una pila del tablero a otra pila, dando vuelta
+# la carta que queda descubierta. Para cada uno se indica si se puede mover
+# entre pilas del tablero (además de a las fundaciones).
+JUEGOS = {
+    'Ejemplo': True,
+    'Eliminador': False,
+}
+
+_MASCARA_64 = (1 << 64) - 1
+
+
+class MotorVectorial:
+    """Juega en paralelo, al mismo paso, una partida de un juego (ver JUEGOS)
+    por cada semilla, guardando todas las mesas en arreglos de numpy:
+        pilas: Arreglo (partidas, pilas, altura máxima) de códigos de carta,
+            con las fundaciones seguidas de las pilas del tablero (el mismo
+            orden que Mesa.pilas()).
+        alturas: Arreglo (partidas, pilas) con la cantidad de cartas de
+            cada pila.
+        topes: Arreglo (partidas, pilas) con el código del tope de cada
+            pila (sin sentido si la pila está vacía).
+    Cada partida se reparte con la fila de crear_mazos() de su semilla y en
+    cada paso elige al azar una de sus jugadas válidas (ver elegir()), así
+    que el resultado de cada partida sólo depende de su semilla y puede
+    reproducirse con el motor escalar (ver jugar_escalar).
+    Las reglas (criterio_apilar y valor_inicial de cada pila) se toman de una
+    mesa armada por el propio solitario y se aplican como tablas."""
+
+    def __init__(self, juego, semillas):
+        """Reparte las partidas de juego, una por semilla."""
+        if np is None:
+            raise ImportError("MotorVectorial requiere numpy")
+        if juego not in JUEGOS:
+            raise ValueError("El motor vectorial no soporta {}".format(juego))
+        self.juego = juego
+        self.semillas = np.asarray(semillas, dtype=np.int64)
+        n = len(self.semillas)
+
+        # Armamos una mesa modelo con un mazo cuyo código k es 52 + k: en
+        # cada pila repartida, codigo % BOCA_ABAJO indica de qué posición
+        # del mazo salió la carta y codigo >= BOCA_ABAJO si quedó boca abajo.
+        modelo = Mesa()
+        crear_solitario(juego, modelo).armar(orden=range(BOCA_ABAJO, CANT_CODIGOS))
+        if not modelo.mazo.es_vacia() or modelo.descarte is not None:
+            raise ValueError("El motor vectorial no soporta {}".format(juego))
+        self.cant_fundaciones = len(modelo.fundaciones)
+        pilas = modelo.fundaciones + modelo.pilas_tablero
+
+        filas = crear_mazos(self.semillas)
+        self.pilas = np.zeros((n, len(pilas), BOCA_ABAJO), dtype=np.int16)
+        self.alturas = np.zeros((n, len(pilas)), dtype=np.int64)
+        self.topes = np.zeros((n, len(pilas)), dtype=np.int16)
+        for p, pila in enumerate(pilas):
+            posiciones = [codigo % BOCA_ABAJO for codigo in pila.codigos]
+            boca_abajo = np.array([codigo >= BOCA_ABAJO for codigo in pila.codigos], dtype=np.int16)
+            self.pilas[:, p, :len(posiciones)] = filas[:, posiciones] % BOCA_ABAJO + boca_abajo * BOCA_ABAJO
+            self.alturas[:, p] = len(posiciones)
+            if posiciones:
+                self.topes[:, p] = self.pilas[:, p, len(posiciones) - 1]
+
+        # Reglas de cada pila como tablas: acepta[p, tope * CANT_CODIGOS + carta]
+        # indica si puede apilarse carta sobre tope, y acepta_vacia[p, carta]
+        # si puede apilarse sobre la pila vacía (ver PilaCartas.puede_apilar).
+        self.acepta = np.ones((len(pilas), CANT_CODIGOS * CANT_CODIGOS), dtype=bool)
+        self.acepta_vacia = np.ones((len(pilas), CANT_CODIGOS), dtype=bool)
+        for p, pila in enumerate(pilas):
+            if pila.valor_inicial is not None:
+                self.acepta_vacia[p] = [carta_de(codigo).valor == pila.valor_inicial for codigo in range(CANT_CODIGOS)]
+            if pila.criterio_apilar is not None:
+                tabla = getattr(pila.criterio_apilar, 'tabla', None)
+                if tabla is None:
+                    tabla = [pila.criterio_apilar(a, b) for a in map(carta_de, range(CANT_CODIGOS)) for b in map(carta_de, range(CANT_CODIGOS))]
+                self.acepta[p] = tabla
+        # Sobre una carta boca abajo puede apilarse cualquier carta.
+        self.acepta.reshape(len(pilas), CANT_CODIGOS, CANT_CODIGOS)[:, BOCA_ABAJO:, :] = True
+
+        # Jugadas posibles, en el orden en que las devuelve jugadas_validas().
+        self.jugadas = []
+        origenes, destinos = [], []
+        tablero = len(modelo.pilas_tablero)
+        for i in range(tablero):
+            for j in range(self.cant_fundaciones):
+                self.jugadas.append([(PILA_TABLERO, i), (FUNDACION, j)])
+                origenes.append(self.cant_fundaciones + i)
+                destinos.append(j)
+            if JUEGOS[juego]:
+                for j in range(tablero):
+                    if j != i:
+                        self.jugadas.append([(PILA_TABLERO, i), (PILA_TABLERO, j)])
+                        origenes.append(self.cant_fundaciones + i)
+                        destinos.append(self.cant_fundaciones + j)
+        self.origenes = np.array(origenes)
+        self.destinos = np.array(destinos)
+        # Jugadas cuyo destino tiene alguna regla: sobre las demás pilas se
+        # puede apilar siempre.
+        libres = self.acepta.all(axis=1) & self.acepta_vacia.all(axis=1)
+        self._con_reglas = np.flatnonzero(~libres[self.destinos])
+
+        self.cantidad_jugadas = np.zeros(n, dtype=np.int64)
+        self.terminada = np.zeros(n, dtype=bool)
+        self._base_azar = splitmix64(self.semillas.astype(np.uint64))
+        self.segundos = 0
+
+    def jugar(self, max_jugadas=MAX_JUGADAS):
+        """Juega todas las partidas hasta que terminen, se queden sin
+        jugadas o lleguen a max_jugadas jugadas."""
+        inicio = time.perf_counter()
+        while True:
+            activas = np.flatnonzero(~self.terminada & (self.cantidad_jugadas < max_jugadas))
+            if not len(activas):
+                break
+            ganadas = self.alturas[activas, self.cant_fundaciones:].sum(axis=1) == 0
+            self.terminada[activas[ganadas]] = True
+            activas = activas[~ganadas]
+
+            validas = self.jugadas_validas(activas)
+            cantidades = validas.sum(axis=1)
+            self.terminada[activas[cantidades == 0]] = True
+            elegidas = self.elegir(activas, validas, cantidades)
+            activas, elegidas = activas[cantidades > 0], elegidas[cantidades > 0]
+            self._mover(activas, self.origenes[elegidas], self.destinos[elegidas])
+            self.cantidad_jugadas[activas] += 1
+        self.segundos += time.perf_counter() - inicio
+
+    def jugadas_validas(self, partidas):
+        """Devuelve un arreglo (len(partidas), len(self.jugadas)) de bools
+        que indica qué jugadas de self.jugadas son válidas en cada una de las
+        partidas (índices)."""
+        alturas = self.alturas[partidas]
+        topes = self.topes[partidas]
+        validas = (alturas > 0)[:, self.origenes]
+        jugadas = self._con_reglas
+        if len(jugadas):
+            destinos = self.destinos[jugadas]
+            cartas = topes[:, self.origenes[jugadas]]
+            acepta = np.where(
+                (alturas == 0)[:, destinos],
+                self.acepta_vacia.ravel()[destinos * CANT_CODIGOS + cartas],
+                self.acepta.ravel()[destinos * CANT_CODIGOS ** 2 + topes[:, destinos].astype(np.int64) * CANT_CODIGOS + cartas])
+            validas[:, jugadas] &= acepta
+        return validas
+
+    def elegir(self, partidas, validas, cantidades):
+        """Elige para cada una de las partidas una de sus jugadas validas:
+        la número floor(u * cantidad), donde u es un número al azar en [0, 1)
+        que depende sólo de la semilla y de la cantidad de jugadas hechas
+        (ver azar_partida). Devuelve los índices en self.jugadas."""
+        u = (splitmix64(self._base_azar[partidas] ^ self.cantidad_jugadas[partidas].astype(np.uint64))
+             >> np.uint64(11)).astype(np.float64) / 2.0 ** 53
+        k = (u * cantidades).astype(np.int64)
+        return np.argmax(np.cumsum(validas, axis=1, dtype=np.int16) > k[:, None], axis=1)
+
+    def _mover(self, partidas, origenes, destinos):
+        """Mueve la carta del tope de origenes a destinos en cada partida y
+        da vuelta la carta que queda en el tope de origen si está boca
+        abajo."""
+        self.alturas[partidas, origenes] -= 1
+        cartas = self.topes[partidas, origenes]
+        self.pilas[partidas, destinos, self.alturas[partidas, destinos]] = cartas
+        self.topes[partidas, destinos] = cartas
+        self.alturas[partidas, destinos] += 1
+
+        alturas = self.alturas[partidas, origenes]
+        topes = self.pilas[partidas, origenes, np.maximum(alturas - 1, 0)]
+        voltear = (alturas > 0) & (topes >= BOCA_ABAJO)
+        topes[voltear] -= BOCA_ABAJO
+        self.pilas[partidas[voltear], origenes[voltear], alturas[voltear] - 1] = topes[voltear]
+        self.topes[partidas, origenes] = topes
+
+    def estado(self, i):
+        """Devuelve el contenido de las pilas de la partida i en el formato
+        de Mesa.estado() (sin el mazo, que siempre está vacío)."""
+        return tuple(tuple(int(codigo) for codigo in self.pilas[i, p, :altura])
+                     for p, altura in enumerate(self.alturas[i]))
+
+    def resultados(self):
+        """Devuelve una lista con un diccionario por partida con semilla,
+        resultado (GANO o PERDIO), jugadas y segundos, como
+        simulador.jugar_partida. Los segundos son el tiempo total repartido
+        entre todas las partidas."""
+        ganadas = self.alturas[:, self.cant_fundaciones:].sum(axis=1) == 0
+        segundos = self.segundos / len(self.semillas) if len(self.semillas) else 0
+        return [{
+            'semilla': int(semilla),
+            'resultado': GANO if gano else PERDIO,
+            'jugadas': int(jugadas),
+            'segundos': segundos,
+        } for semilla, gano, jugadas in zip(self.semillas, ganadas, self.cantidad_jugadas)]
+
+
+def azar_partida(semilla, n):
+    """Número al azar en [0, 1) con el que se elige la jugada n de la partida
+    de la semilla dada (ver MotorVectorial.elegir)."""
+    return (_splitmix64(_splitmix64(semilla & _MASCARA_64) ^ n) >> 11) / 2.0 ** 53
+
+
+def _splitmix64(x):
+    """Ídem mazo.splitmix64, para un entero de Python."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASCARA_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+    return x ^ (x >> 31)
+
+
+def jugar_escalar(juego, semilla, max_jugadas=MAX_JUGADAS):
+    """Juega con el motor escalar (Mesa y el solitario) la misma partida que
+    juega MotorVectorial para la semilla dada. Devuelve (resultado, mesa),
+    con resultado en el formato de MotorVectorial.resultados()."""
+    inicio = time.perf_counter()
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(orden=crear_mazos([semilla])[0])
+    n = 0
+    while n < max_jugadas and not solitario.termino():
+        jugadas = solitario.jugadas_validas()
+        if not jugadas:
+            break
+        solitario.jugar(jugadas[int(azar_partida(semilla, n) * len(jugadas))])
+        n += 1
+    return {
+        'semilla': semilla,
+        'resultado': GANO if solitario.termino() else PERDIO,
+        'jugadas': n,
+        'segundos': time.perf_counter() - inicio,
+    }, mesa
+
+
+def verificar(motor, cantidad=None, max_jugadas=MAX_JUGADAS):
+    """Compara las primeras cantidad partidas (todas si es None) de un
+    MotorVectorial ya jugado con max_jugadas contra el motor escalar.
+    Devuelve la lista de semillas cuyo resultado, cantidad de jugadas o mesa
+    final no coinciden."""
+    distintas = []
+    for i, resultado in enumerate(motor.resultados()[:cantidad]):
+        escalar, mesa = jugar_escalar(motor.juego, resultado['semilla'], max_jugadas)
+        if (escalar['resultado'], escalar['jugadas']) != (resultado['resultado'], resultado['jugadas']) \
+                or mesa.estado()[:-1] != motor.estado(i):
+            distintas.append(resultado['semilla'])
+    return distintas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula en paralelo, con numpy, partidas que eligen jugadas al azar.")
+    parser.add_argument('juego', choices=sorted(JUEGOS))
+    parser.add_argument('desde', type=int, help="primera semilla")
+    parser.add_argument('hasta', type=int, help="semilla final (no incluida)")
+    parser.add_argument('-m', '--max-jugadas', type=int, default=MAX_JUGADAS)
+    parser.add_argument('-v', '--verificar', type=int, default=0, metavar='N',
+                        help="compara las primeras N partidas contra el motor escalar")
+    args = parser.parse_args()
+
+    motor = MotorVectorial(args.juego, range(args.desde, args.hasta))
+    motor.jugar(args.max_jugadas)
+    resultados = motor.resultados()
+    for resultado in resultados:
+        sys.stdout.write(json.dumps(resultado) + '\n')
+
+    ganadas = sum(resultado['resultado'] == GANO for resultado in resultados)
+    resumen = {
+        'juego': args.juego,
+        'politica': 'azar',
+        'partidas': len(resultados),
+        'ganadas': ganadas,
+        'tasa_victorias': ganadas / len(resultados) if resultados else 0,
+        'segundos': motor.segundos,
+        'partidas_por_segundo': len(resultados) / motor.segundos if motor.segundos else 0,
+    }
+    if args.verificar:
+        resumen['distintas'] = verificar(motor, args.verificar, args.max_jugadas)
+    sys.stdout.write(json.dumps({'resumen': resumen}) + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,17 @@
 from mesa import *
 from mazo import*
 
-class Solitario...:
+class Solitario:
     """Interfaz para implementar un solitario."""
 
     def __init__(self, mesa):
         """Inicializa con una mesa creada y vacía."""
         pass
 
-    def armar(self):
-        """Arma el tablero con la configuración inicial."""
+    def armar(self, azar=None, orden=None):
+        """Arma el tablero con la configuración inicial.
+        El mazo se mezcla con el generador azar, o tiene los códigos de
+        orden si se da (ver crear_mazo)."""
         pass
 
     def termino(self):
@@ -21,3 +23,8 @@ class Solitario...:
             La jugada es una lista de pares (PILA, numero). (Ver mesa.)
             Si no puede realizarse la jugada se levanta una excepción SolitarioError *descriptiva*."""
         pass
+
+    def jugadas_validas(self):
+        """Devuelve la lista de todas las jugadas que jugar() aceptaría en la
+        configuración actual, en el formato de Mesa.parsear_jugada."""
+        pass
@@ -11,14 +11,15 @@ class SolitarioClasico:
         """Inicializa con una mesa creada y vacía."""
         self.mesa = mesa
 
-    def armar(self):
-        """Arma el tablero con la configuración inicial."""
-        self.mesa.mazo = crear_mazo()
+    def armar(self, azar=None, orden=None):
+        """Arma el tablero con la configuración inicial.
+        El mazo se mezcla con el generador azar, o tiene los códigos de
+        orden si se da (ver crear_mazo)."""
+        self.mesa.mazo = crear_mazo(azar = azar, orden = orden)
         self.mesa.descarte = PilaCartas(
             pila_visible = True,
         )
-        self.mesa.descarte.apilar(self.mesa.mazo.desapilar(), forzar = True)
-        self.mesa.descarte.tope().voltear()
+        self.mesa.descarte.repartir(self.mesa.mazo, 1, tope_boca_arriba = True)
 
         for i in range(CANT_FUNDACIONES):
             # Creamos 4 fundaciones, una para cada palo, no más restricciones
@@ -37,10 +38,8 @@ class SolitarioClasico:
                     criterio_apilar = criterio(palo = DISTINTO_COLOR, orden = ASCENDENTE)
                 ))
 
-            for _ in range(4 + (1 if i < 4 else 0)):
-                # Barajamos cartas en nuestra pila
-                self.mesa.pilas_tablero[i].apilar(self.mesa.mazo.desapilar(), forzar = True)
-            self.mesa.pilas_tablero[i].tope().voltear() # Ponemos boca arriba todas las cartas.
+            # Barajamos cartas en nuestra pila y ponemos boca arriba la última.
+            self.mesa.pilas_tablero[i].repartir(self.mesa.mazo, 4 + (1 if i < 4 else 0), tope_boca_arriba = True)
 
     def termino(self):
         """Avisa si el juego se terminó."""
@@ -71,12 +70,11 @@ class SolitarioClasico:
             # Muevo una carta del maso al descarte
             if self.mesa.mazo.es_vacia():
                 while not self.mesa.descarte.es_vacia():
-                    carta = self.mesa.descarte.desapilar()
-                    carta.voltear()
+                    carta = self.mesa.descarte.desapilar().voltear()
                     self.mesa.mazo.apilar(carta, forzar = True)
             else:
                 self.mesa.descarte.apilar(self.mesa.mazo.desapilar(), forzar = True)
-                self.mesa.descarte.tope().voltear()      
+                self.mesa.descarte.voltear()      
         elif len(jugada) == 2 and j0 == PILA_TABLERO and j1 in (FUNDACION, PILA_TABLERO):
             # Especificaron origen y destino, intentamos mover del tablero adonde corresponda.
             destino = self.mesa.fundaciones[p1] if j1 == FUNDACION else self.mesa.pilas_tablero[p1]
@@ -89,6 +87,32 @@ class SolitarioClasico:
             # No hay más jugadas válidas según nuestras reglas.
             raise SolitarioError("Movimiento inválido")
 
+    def jugadas_validas(self):
+        """Devuelve la lista de todas las jugadas que jugar() aceptaría, en el
+        formato de Mesa.parsear_jugada. Las jugadas de una sola pila que
+        equivalen a una jugada origen-destino no se repiten."""
+        jugadas = []
+        if not self.mesa.mazo.es_vacia() or not self.mesa.descarte.es_vacia():
+            jugadas.append([(MAZO, 0)])
+
+        for i, origen in enumerate(self.mesa.pilas_tablero):
+            for j, fundacion in enumerate(self.mesa.fundaciones):
+                if fundacion.cantidad_a_mover(origen):
+                    jugadas.append([(PILA_TABLERO, i), (FUNDACION, j)])
+            for j, pila in enumerate(self.mesa.pilas_tablero):
+                if j != i and pila.cantidad_a_mover(origen):
+                    jugadas.append([(PILA_TABLERO, i), (PILA_TABLERO, j)])
+
+        if not self.mesa.descarte.es_vacia():
+            carta = self.mesa.descarte.tope()
+            for j, fundacion in enumerate(self.mesa.fundaciones):
+                if fundacion.puede_apilar(carta):
+                    jugadas.append([(DESCARTE, 0), (FUNDACION, j)])
+            for j, pila in enumerate(self.mesa.pilas_tablero):
+                if pila.puede_apilar(carta):
+                    jugadas.append([(DESCARTE, 0), (PILA_TABLERO, j)])
+        return jugadas
+
     def _carta_a_pila(self, origen, pila):
         """Mueve la carta del tope entre dos pilas, si se puede, levanta SolitarioError si no."""
         if origen.es_vacia():
@@ -99,7 +123,7 @@ class SolitarioClasico:
         origen.desapilar()
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
+            origen.voltear()
     
     def _pila_a_pila(self, origen, pila):
         """Mueve la carta del tope entre dos pilas, si se puede, levanta SolitarioError si no."""
@@ -110,4 +134,4 @@ class SolitarioClasico:
         pila.mover(origen)
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
\ No newline at end of file
+            origen.voltear()
\ No newline at end of file
@@ -17,9 +17,11 @@ class SolitarioEjemplo:
         """Inicializa con una mesa creada."""
         self.mesa = mesa
 
-    def armar(self):
-        """Arma el tablero a la configuración inicial."""
-        self.mesa.mazo = crear_mazo() # Creamos un mazo.
+    def armar(self, azar=None, orden=None):
+        """Arma el tablero a la configuración inicial.
+        El mazo se mezcla con el generador azar, o tiene los códigos de
+        orden si se da (ver crear_mazo)."""
+        self.mesa.mazo = crear_mazo(azar=azar, orden=orden) # Creamos un mazo.
 
         for i in range(4):
             # Creamos 4 fundaciones, una para cada palo, no más restricciones
@@ -35,10 +37,8 @@ class SolitarioEjemplo:
                     pila_visible=True,
                 ))
 
-            for j in range(4 + (1 if i < 4 else 0)):
-                # Barajamos cartas en nuestra pila
-                self.mesa.pilas_tablero[i].apilar(self.mesa.mazo.desapilar())
-            self.mesa.pilas_tablero[i].tope().voltear() # Ponemos boca arriba la última carta.
+            # Barajamos cartas en nuestra pila y ponemos boca arriba la última.
+            self.mesa.pilas_tablero[i].repartir(self.mesa.mazo, 4 + (1 if i < 4 else 0), tope_boca_arriba=True)
 
     def termino(self):
         """Avisa si el juego se terminó."""
@@ -71,6 +71,23 @@ class SolitarioEjemplo:
             # No hay más jugadas válidas según nuestras reglas.
             raise SolitarioError("Movimiento inválido")
 
+    def jugadas_validas(self):
+        """Devuelve la lista de todas las jugadas que jugar() aceptaría, en el
+        formato de Mesa.parsear_jugada. Las jugadas de una sola pila que
+        equivalen a una jugada origen-destino no se repiten."""
+        jugadas = []
+        for i, origen in enumerate(self.mesa.pilas_tablero):
+            if origen.es_vacia():
+                continue
+            carta = origen.tope()
+            for j, fundacion in enumerate(self.mesa.fundaciones):
+                if fundacion.puede_apilar(carta):
+                    jugadas.append([(PILA_TABLERO, i), (FUNDACION, j)])
+            for j, pila in enumerate(self.mesa.pilas_tablero):
+                if j != i and pila.puede_apilar(carta):
+                    jugadas.append([(PILA_TABLERO, i), (PILA_TABLERO, j)])
+        return jugadas
+
     def _carta_a_pila(self, origen, pila):
         """Mueve la carta del tope entre dos pilas, si se puede, levanta SolitarioError si no."""
         if origen.es_vacia():
@@ -81,4 +98,4 @@ class SolitarioEjemplo:
         origen.desapilar()
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
+            origen.voltear()
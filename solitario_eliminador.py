@@ -3,6 +3,7 @@ from mazo import*
 
 CANT_FUNDACIONES = 6
 CANT_PILAS_TABLERO = 4
+CANTIDAD_CARTAS = 13
 
 class SolitarioEliminador:
     """Interfaz para implementar un solitario."""
@@ -11,9 +12,11 @@ class SolitarioEliminador:
         """Inicializa con una mesa creada y vacía."""
         self.mesa = mesa
 
-    def armar(self):
-        """Arma el tablero con la configuración inicial."""
-        self.mesa.mazo = crear_mazo()
+    def armar(self, azar=None, orden=None):
+        """Arma el tablero con la configuración inicial.
+        El mazo se mezcla con el generador azar, o tiene los códigos de
+        orden si se da (ver crear_mazo)."""
+        self.mesa.mazo = crear_mazo(azar = azar, orden = orden)
 
         for i in range(CANT_FUNDACIONES):
             # Creamos 6 fundaciones, una para cada palo, no más restricciones
@@ -29,10 +32,8 @@ class SolitarioEliminador:
                     pila_visible=True,
                 ))
 
-            for _ in range(CANTIDAD_CARTAS):
-                # Barajamos cartas en nuestra pila
-                self.mesa.pilas_tablero[i].apilar(self.mesa.mazo.desapilar())
-                self.mesa.pilas_tablero[i].tope().voltear() # Ponemos boca arriba todas las cartas.
+            # Barajamos cartas en nuestra pila, todas boca arriba.
+            self.mesa.pilas_tablero[i].repartir(self.mesa.mazo, CANTIDAD_CARTAS, boca_arriba = True)
 
     def termino(self):
         """Avisa si el juego se terminó."""
@@ -65,6 +66,20 @@ class SolitarioEliminador:
             # No hay más jugadas válidas según nuestras reglas.
             raise SolitarioError("Movimiento inválido")
 
+    def jugadas_validas(self):
+        """Devuelve la lista de todas las jugadas que jugar() aceptaría, en el
+        formato de Mesa.parsear_jugada. Las jugadas de una sola pila que
+        equivalen a una jugada origen-destino no se repiten."""
+        jugadas = []
+        for i, origen in enumerate(self.mesa.pilas_tablero):
+            if origen.es_vacia():
+                continue
+            carta = origen.tope()
+            for j, fundacion in enumerate(self.mesa.fundaciones):
+                if fundacion.puede_apilar(carta):
+                    jugadas.append([(PILA_TABLERO, i), (FUNDACION, j)])
+        return jugadas
+
     def _carta_a_pila(self, origen, pila):
         """Mueve la carta del tope entre dos pilas, si se puede, levanta SolitarioError si no."""
         if origen.es_vacia():
@@ -75,4 +90,4 @@ class SolitarioEliminador:
         origen.desapilar()
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
\ No newline at end of file
+            origen.voltear()
\ No newline at end of file
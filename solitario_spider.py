@@ -11,9 +11,11 @@ class SolitarioSpider:
         """Inicializa con una mesa creada y vacía."""
         self.mesa = mesa
 
-    def armar(self):
-        """Arma el tablero con la configuración inicial."""
-        self.mesa.mazo = crear_mazo(mazos = 2, palos = 1)
+    def armar(self, azar=None, orden=None):
+        """Arma el tablero con la configuración inicial.
+        El mazo se mezcla con el generador azar, o tiene los códigos de
+        orden si se da (ver crear_mazo)."""
+        self.mesa.mazo = crear_mazo(mazos = 2, palos = 1, azar = azar, orden = orden)
 
         for i in range(CANT_FUNDACIONES):
             # Creamos 8 fundaciones, una para cada palo, no más restricciones
@@ -32,10 +34,8 @@ class SolitarioSpider:
                     criterio_mover = criterio(orden= ASCENDENTE)
                 ))
 
-            for _ in range(5 + (1 if (i % 3 == 0) else 0)):
-                # Barajamos cartas en nuestra pila
-                self.mesa.pilas_tablero[i].apilar(self.mesa.mazo.desapilar(), forzar = True)
-            self.mesa.pilas_tablero[i].tope().voltear() # Ponemos boca arriba todas las cartas.
+            # Barajamos cartas en nuestra pila y ponemos boca arriba la última.
+            self.mesa.pilas_tablero[i].repartir(self.mesa.mazo, 5 + (1 if (i % 3 == 0) else 0), tope_boca_arriba = True)
 
     def termino(self):
         """Avisa si el juego se terminó."""
@@ -62,7 +62,7 @@ class SolitarioSpider:
                 raise SolitarioError('El mazo está vacío')
             for i in range(10):
                 self.mesa.pilas_tablero[i].apilar(self.mesa.mazo.desapilar(), forzar = True)
-                self.mesa.pilas_tablero[i].tope().voltear() # Ponemos boca arriba todas las cartas.
+                self.mesa.pilas_tablero[i].voltear() # Ponemos boca arriba todas las cartas.
 
         elif len(jugada) == 2 and j0 == PILA_TABLERO and j1 == PILA_TABLERO:
             # Especificaron origen y destino, intentamos mover del tablero adonde corresponda.
@@ -72,6 +72,23 @@ class SolitarioSpider:
             # No hay más jugadas válidas según nuestras reglas.
             raise SolitarioError("Movimiento inválido")
 
+    def jugadas_validas(self):
+        """Devuelve la lista de todas las jugadas que jugar() aceptaría, en el
+        formato de Mesa.parsear_jugada."""
+        jugadas = []
+        if not self.mesa.mazo.es_vacia():
+            jugadas.append([(MAZO, 0)])
+
+        hay_fundacion = any(fundacion.es_vacia() for fundacion in self.mesa.fundaciones)
+        for i, origen in enumerate(self.mesa.pilas_tablero):
+            if hay_fundacion and origen.cantidad_movible() == 13:
+                # Hay una escalera completa de K a A en el tope.
+                jugadas.append([(PILA_TABLERO, i)])
+            for j, pila in enumerate(self.mesa.pilas_tablero):
+                if j != i and pila.cantidad_a_mover(origen):
+                    jugadas.append([(PILA_TABLERO, i), (PILA_TABLERO, j)])
+        return jugadas
+
     def _carta_a_pila(self, origen, pila):
         """Mueve la carta del tope entre dos pilas, si se puede, levanta SolitarioError si no."""
         if origen.es_vacia():
@@ -82,7 +99,7 @@ class SolitarioSpider:
         origen.desapilar()
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
+            origen.voltear()
 
     def _pila_a_pila(self, origen, pila):
         """Mueve una pila de cartas a otras, si se puede, levanta SolitarioError si no."""
@@ -93,7 +110,7 @@ class SolitarioSpider:
         pila.mover(origen)
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
+            origen.voltear()
 
     def _pila_a_fundacion(self, origen, fundacion):
         """Mueve una pila a la fundación, si se puede, levanta SolitarioError si no."""
@@ -112,6 +129,6 @@ class SolitarioSpider:
             fundacion.apilar(aux.desapilar(),True)
 
         if not origen.es_vacia() and origen.tope().boca_abajo:
-            origen.tope().voltear()
+            origen.voltear()
 
             
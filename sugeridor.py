@@ -0,0 +1,173 @@
+from mesa import *
+
+import os, math, time, random, atexit, multiprocessing
+
+# Largo máximo de cada partida simulada a partir de la jugada a evaluar.
+MAX_JUGADAS = 300
+
+# Parte del presupuesto que se reserva para juntar los resultados de los
+# procesos: las simulaciones dejan de empezar partidas antes de ese margen.
+MARGEN = 0.1
+
+# Valor de z del intervalo de confianza (95%).
+Z = 1.96
+
+AZAR = 'azar'
+CODICIOSO = 'codicioso'
+
+_pool = None
+_procesos_pool = None
+
+# Mesa reconstruida en cada proceso para la última posición recibida:
+# (clase, snapshot) -> Mesa.
+_base = {}
+
+
+def sugerir(mesa, solitario, presupuesto_ms, procesos=None, politica=AZAR, semilla=None):
+    """Estima, para cada jugada válida de la posición actual, la probabilidad
+    de ganar si se la hace, jugando partidas al azar (politica AZAR) o
+    prefiriendo subir cartas a las fundaciones (CODICIOSO) desde copias de
+    la mesa, repartidas entre procesos procesos (todos los procesadores si
+    es None; si es 1 no se crean procesos).
+    En cada partida simulada las cartas boca abajo se vuelven a mezclar
+    entre sí (ver determinizar), así que la sugerencia no usa información
+    que el jugador no tiene.
+    La función vuelve antes de presupuesto_ms milisegundos: lo que no llegó
+    a simularse en ese tiempo no se tiene en cuenta.
+    Devuelve (jugada, estadisticas) donde jugada es la mejor jugada (o None
+    si no hay jugadas válidas) y estadisticas es una lista de diccionarios,
+    de la mejor jugada a la peor, con jugada, partidas, ganadas,
+    probabilidad, intervalo (de confianza del 95%, de Wilson) y progreso (el
+    promedio de cartas en las fundaciones al final de las partidas, que
+    desempata cuando no se gana ninguna)."""
+    limite = time.monotonic() + presupuesto_ms / 1000
+    jugadas = solitario.jugadas_validas()
+    if not jugadas:
+        return None, []
+
+    if semilla is None:
+        semilla = random.getrandbits(32)
+    tarea = (type(solitario), mesa.snapshot(), jugadas, politica, limite - MARGEN * presupuesto_ms / 1000)
+    procesos = procesos or os.cpu_count() or 1
+    cuentas = [[0, 0, 0] for _ in jugadas]
+
+    if procesos == 1:
+        resultados = [_simular(tarea + (semilla,))]
+    else:
+        pool = _obtener_pool(procesos)
+        pendientes = [pool.apply_async(_simular, (tarea + (semilla + i,),)) for i in range(procesos)]
+        resultados = []
+        for pendiente in pendientes:
+            try:
+                resultados.append(pendiente.get(max(0, limite - time.monotonic())))
+            except multiprocessing.TimeoutError:
+                pass
+
+    for resultado in resultados:
+        for cuenta, parcial in zip(cuentas, resultado):
+            for i in range(3):
+                cuenta[i] += parcial[i]
+
+    estadisticas = []
+    for jugada, (partidas, ganadas, fundaciones) in zip(jugadas, cuentas):
+        estadisticas.append({
+            'jugada': jugada,
+            'partidas': partidas,
+            'ganadas': ganadas,
+            'probabilidad': ganadas / partidas if partidas else 0,
+            'intervalo': intervalo_wilson(ganadas, partidas),
+            'progreso': fundaciones / partidas if partidas else 0,
+        })
+    estadisticas.sort(key=lambda e: (e['probabilidad'], e['progreso']), reverse=True)
+    return estadisticas[0]['jugada'], estadisticas
+
+
+def intervalo_wilson(ganadas, partidas, z=Z):
+    """Devuelve el intervalo de confianza de Wilson (inferior, superior) de
+    la probabilidad de ganar, o (0, 1) si no hay partidas."""
+    if not partidas:
+        return (0, 1)
+    p = ganadas / partidas
+    denominador = 1 + z * z / partidas
+    centro = (p + z * z / (2 * partidas)) / denominador
+    radio = z * math.sqrt(p * (1 - p) / partidas + z * z / (4 * partidas * partidas)) / denominador
+    return (max(0, centro - radio), min(1, centro + radio))
+
+
+def determinizar(mesa, azar):
+    """Mezcla entre sí las cartas boca abajo de toda la mesa, dejando cada
+    una en el lugar de otra carta boca abajo."""
+    pilas = [pila for pila in mesa.pilas() if any(codigo >= BOCA_ABAJO for codigo in pila.codigos)]
+    ocultas = [codigo for pila in pilas for codigo in pila.codigos if codigo >= BOCA_ABAJO]
+    azar.shuffle(ocultas)
+    siguiente = iter(ocultas)
+    for pila in pilas:
+        pila.reemplazar([next(siguiente) if codigo >= BOCA_ABAJO else codigo for codigo in pila.codigos])
+
+
+def _simular(tarea):
+    """Juega partidas desde la posición de tarea, repartidas en ronda entre
+    sus jugadas, hasta el límite de tiempo. Devuelve, por jugada,
+    [partidas, ganadas, cartas en las fundaciones al final]."""
+    clase, snapshot, jugadas, politica, limite, semilla = tarea
+    azar = random.Random(semilla)
+    base = _base.get((clase, snapshot))
+    if base is None:
+        base = Mesa()
+        clase(base).armar(azar)
+        base.restore(snapshot)
+        _base.clear()
+        _base[(clase, snapshot)] = base
+
+    cuentas = [[0, 0, 0] for _ in jugadas]
+    n = 0
+    while time.monotonic() < limite:
+        i = n % len(jugadas)
+        n += 1
+        mesa = base.clonar()
+        determinizar(mesa, azar)
+        solitario = clase(mesa)
+        try:
+            solitario.jugar(jugadas[i])
+        except SolitarioError:
+            # Con otras cartas boca abajo la jugada puede no ser válida.
+            continue
+        ganada = _terminar_partida(solitario, politica, azar, limite)
+        if ganada is None:
+            break
+        cuentas[i][0] += 1
+        cuentas[i][1] += ganada
+        cuentas[i][2] += sum(len(fundacion.codigos) for fundacion in mesa.fundaciones)
+    return cuentas
+
+
+def _terminar_partida(solitario, politica, azar, limite):
+    """Juega la partida hasta que termine, no haya jugadas o se llegue a
+    MAX_JUGADAS. Devuelve si se ganó, o None si se alcanzó el límite de
+    tiempo antes de terminar."""
+    for _ in range(MAX_JUGADAS):
+        if solitario.termino():
+            return True
+        if time.monotonic() >= limite:
+            return None
+        jugadas = solitario.jugadas_validas()
+        if not jugadas:
+            return False
+        if politica == CODICIOSO:
+            a_fundacion = [jugada for jugada in jugadas if jugada[-1][0] == FUNDACION]
+            jugadas = a_fundacion or jugadas
+        solitario.jugar(azar.choice(jugadas))
+    return solitario.termino()
+
+
+def _obtener_pool(procesos):
+    """Devuelve el Pool de procesos, creándolo la primera vez (o si cambió la
+    cantidad de procesos). El Pool se reutiliza entre sugerencias."""
+    global _pool, _procesos_pool
+    if _pool is None or _procesos_pool != procesos:
+        if _pool is not None:
+            _pool.terminate()
+        _pool = multiprocessing.Pool(procesos)
+        _procesos_pool = procesos
+        atexit.register(_pool.terminate)
+    return _pool
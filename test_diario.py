@@ -0,0 +1,89 @@
+from main import SOLITARIOS, crear_solitario
+from mesa import *
+import random
+
+import pytest
+
+
+def _partida(juego, semilla):
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(random.Random(semilla))
+    mesa.iniciar_diario()
+    return mesa, solitario
+
+
+def _jugar_al_azar(mesa, solitario, azar, cantidad):
+    """Juega hasta cantidad jugadas válidas al azar. Devuelve la lista de
+    (snapshot, huella) después de cada una."""
+    estados = []
+    for _ in range(cantidad):
+        jugadas = solitario.jugadas_validas()
+        if not jugadas or solitario.termino():
+            break
+        solitario.jugar(azar.choice(jugadas))
+        mesa.confirmar_jugada()
+        estados.append((mesa.snapshot(), mesa.huella()))
+    return estados
+
+
+@pytest.mark.parametrize('juego', sorted(SOLITARIOS))
+def test_deshacer_y_rehacer_todo(juego):
+    for semilla in range(10):
+        mesa, solitario = _partida(juego, semilla)
+        reparto = (mesa.snapshot(), mesa.huella())
+        estados = _jugar_al_azar(mesa, solitario, random.Random(semilla), 80)
+        assert estados
+
+        for estado in reversed([reparto] + estados[:-1]):
+            assert mesa.deshacer()
+            assert (mesa.snapshot(), mesa.huella()) == estado
+        assert not mesa.deshacer()
+
+        for estado in estados:
+            assert mesa.rehacer()
+            assert (mesa.snapshot(), mesa.huella()) == estado
+        assert not mesa.rehacer()
+
+
+@pytest.mark.parametrize('juego', sorted(SOLITARIOS))
+def test_una_jugada_nueva_descarta_las_deshechas(juego):
+    mesa, solitario = _partida(juego, 1)
+    azar = random.Random(1)
+    estados = _jugar_al_azar(mesa, solitario, azar, 10)
+    for _ in range(3):
+        mesa.deshacer()
+    nuevos = _jugar_al_azar(mesa, solitario, azar, 1)
+    assert nuevos
+    assert not mesa.rehacer()
+    assert mesa.deshacer()
+    assert mesa.snapshot() == estados[-4][0]
+
+
+def test_revertir_una_jugada_a_medias():
+    mesa, solitario = _partida('Clasico', 2)
+    _jugar_al_azar(mesa, solitario, random.Random(2), 5)
+    antes = (mesa.snapshot(), mesa.huella())
+
+    # Una jugada que falla después de haber movido cartas.
+    mesa.descarte.apilar(mesa.mazo.desapilar(), forzar=True)
+    mesa.pilas_tablero[0].voltear()
+    mesa.revertir_jugada()
+    assert (mesa.snapshot(), mesa.huella()) == antes
+
+    # Lo revertido no queda en el diario: deshacer vuelve a la jugada anterior.
+    mesa.descarte.apilar(mesa.mazo.desapilar(), forzar=True)
+    assert mesa.deshacer()
+    assert mesa.rehacer()
+    assert (mesa.snapshot(), mesa.huella()) == antes
+
+
+def test_jugada_invalida_no_cambia_el_diario():
+    mesa, solitario = _partida('Clasico', 3)
+    estados = _jugar_al_azar(mesa, solitario, random.Random(3), 5)
+    with pytest.raises(SolitarioError):
+        solitario.jugar([(MAZO, 0), (MAZO, 0), (MAZO, 0)])
+    mesa.revertir_jugada()
+    assert mesa.snapshot() == estados[-1][0]
+    assert mesa.deshacer()
+    assert mesa.snapshot() == estados[-2][0]
@@ -0,0 +1,75 @@
+from log_binario import *
+from main import crear_solitario, ejecutar, foto_mesa, recuperar, reproducir_log
+import random
+
+import pytest
+
+
+def _escribir_log(ruta, semilla, juego, comandos, cada_foto=7):
+    """Juega los comandos y escribe el log de texto como main, con una foto
+    cada cada_foto comandos. Devuelve el snapshot final."""
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(random.Random(semilla))
+    mesa.iniciar_diario()
+    with open(ruta, 'w') as f:
+        f.write('{}\n{}\n'.format(semilla, juego))
+        for n, comando in enumerate(comandos, 1):
+            f.write(comando + '\n')
+            try:
+                ejecutar(mesa, solitario, mesa.parsear_jugada(comando))
+            except SolitarioError:
+                pass
+            if not n % cada_foto:
+                f.write(CHECKPOINT + foto_mesa(mesa) + '\n')
+    return mesa.snapshot()
+
+
+def _retomar(ruta):
+    semilla, juego, tramos = recuperar(ruta)
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(random.Random(semilla))
+    mesa.iniciar_diario()
+    reproducir_log(mesa, solitario, tramos)
+    return mesa.snapshot()
+
+
+def test_ida_y_vuelta(tmp_path):
+    comandos = ['M', 'MN', 'N', 'A', 'AB', 'N1', 'B2', 'UUU', 'M', 'RR', 'UR', 'M', 'DC', 'MMM', 'U', 'RUM']
+    texto, binario, vuelta = (str(tmp_path / nombre) for nombre in ('log', 'log.bin', 'vuelta'))
+    snapshot = _escribir_log(texto, 11, 'Clasico', comandos * 5)
+
+    texto_a_binario(texto, binario)
+    binario_a_texto(binario, vuelta)
+
+    with open(texto) as f:
+        lineas = f.read().split('\n')
+    with open(vuelta) as f:
+        lineas_vuelta = f.read().split('\n')
+    esperadas = [linea[0] if linea[:1] in ('U', 'R') else linea for linea in lineas]
+    assert lineas_vuelta == esperadas
+    assert _retomar(vuelta) == _retomar(texto) == snapshot
+
+
+def test_lector(tmp_path):
+    texto, binario = str(tmp_path / 'log'), str(tmp_path / 'log.bin')
+    _escribir_log(texto, 2, 'Clasico', ['M', 'AB', 'UU'] * 5, cada_foto=4)
+    texto_a_binario(texto, binario)
+    with LectorLog(binario) as lector:
+        assert (lector.semilla, lector.juego, lector.cantidad) == (2, 'Clasico', 15)
+        assert lector.jugada(1) == [(PILA_TABLERO, 0), (PILA_TABLERO, 1)]
+        assert lector.comando(2) == 'U'
+        assert lector.foto_anterior(3) == (0, None)
+        assert lector.foto_anterior(9)[0] == 8
+        assert len(lector.fotos()) == 3
+        with pytest.raises(IndexError):
+            lector.jugada(15)
+
+
+@pytest.mark.parametrize('contenido', [b'', b'SOLB', MAGICO + bytes(40), b'x' * 100])
+def test_archivo_invalido(tmp_path, contenido):
+    ruta = tmp_path / 'log.bin'
+    ruta.write_bytes(contenido)
+    with pytest.raises(ValueError):
+        LectorLog(str(ruta))
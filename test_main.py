@@ -0,0 +1,78 @@
+from main import *
+import random
+
+
+def _jugar(juego, semilla, comandos):
+    """Juega los comandos como main (con una foto cada CADA_CHECKPOINT
+    comandos). Devuelve (snapshot final, tramos del log como los devuelve
+    recuperar)."""
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(random.Random(semilla))
+    mesa.iniciar_diario()
+    tramos = [(None, [])]
+    desde_foto = 0
+    for comando in comandos:
+        if solitario.termino():
+            break
+        tramos[-1][1].append(comando)
+        try:
+            ejecutar(mesa, solitario, mesa.parsear_jugada(comando))
+        except SolitarioError:
+            pass
+        desde_foto += 1
+        if desde_foto >= CADA_CHECKPOINT:
+            tramos.append((foto_mesa(mesa), []))
+            desde_foto = 0
+    return mesa.snapshot(), tramos
+
+
+def _retomar(juego, semilla, tramos):
+    """Arma la partida y reproduce los tramos como main -resume. Devuelve la
+    mesa."""
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(random.Random(semilla))
+    mesa.iniciar_diario()
+    reproducir_log(mesa, solitario, tramos)
+    return mesa
+
+
+def test_rehacer_despues_de_la_foto():
+    # La foto se toma justo después de la U: la R necesita el diario previo.
+    comandos = ['M'] * (CADA_CHECKPOINT - 1) + ['U', 'R']
+    snapshot, tramos = _jugar('Clasico', 3, comandos)
+    assert len(tramos) == 2
+    assert _retomar('Clasico', 3, tramos).snapshot() == snapshot
+
+
+def test_deshacer_mas_alla_de_la_foto():
+    comandos = ['M'] * CADA_CHECKPOINT + ['U', 'U', 'U']
+    snapshot, tramos = _jugar('Clasico', 5, comandos)
+    assert _retomar('Clasico', 5, tramos).snapshot() == snapshot
+
+
+def test_deshacer_y_rehacer_con_varias_fotos():
+    for semilla in range(20):
+        azar = random.Random(semilla)
+        letras = 'ABCD1234MNUUURR'
+        comandos = [''.join(azar.choice(letras) for _ in range(azar.choice((1, 2)))) for _ in range(300)]
+        snapshot, tramos = _jugar('Clasico', semilla, comandos)
+        assert _retomar('Clasico', semilla, tramos).snapshot() == snapshot
+
+
+def test_foto_cortada(tmp_path):
+    comandos = ['M'] * (CADA_CHECKPOINT + 10)
+    snapshot, tramos = _jugar('Clasico', 7, comandos)
+    ruta = tmp_path / 'solitario.log'
+    with open(ruta, 'w') as f:
+        f.write('7\nClasico\n')
+        for foto, posteriores in tramos:
+            if foto is not None:
+                f.write(CHECKPOINT + foto + '\n')
+            f.writelines(comando + '\n' for comando in posteriores)
+        # El programa se cayó mientras escribía una foto.
+        f.write(CHECKPOINT + '0304\n')
+
+    semilla, juego, tramos = recuperar(str(ruta))
+    assert _retomar(juego, semilla, tramos).snapshot() == snapshot
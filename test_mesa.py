@@ -0,0 +1,71 @@
+from main import SOLITARIOS, crear_solitario
+from mesa import *
+import random
+
+import pytest
+
+
+def _mesa(juego, semilla, jugadas=0):
+    """Arma la partida y juega al azar hasta jugadas jugadas válidas."""
+    azar = random.Random(semilla)
+    mesa = Mesa()
+    solitario = crear_solitario(juego, mesa)
+    solitario.armar(azar)
+    for _ in range(jugadas):
+        validas = solitario.jugadas_validas()
+        if not validas or solitario.termino():
+            break
+        solitario.jugar(azar.choice(validas))
+    return mesa
+
+
+@pytest.mark.parametrize('juego', sorted(SOLITARIOS))
+def test_snapshot_y_restore(juego):
+    for semilla in range(5):
+        jugada = _mesa(juego, semilla, 40)
+        mesa = _mesa(juego, semilla)
+        mesa.restore(jugada.snapshot())
+        assert mesa.snapshot() == jugada.snapshot()
+        assert mesa.estado() == jugada.estado()
+        assert mesa.huella() == jugada.huella()
+        mesa.restore(bytearray(_mesa(juego, semilla).snapshot()))
+        assert mesa.huella() == _mesa(juego, semilla).huella()
+
+
+def test_restore_olvida_el_diario():
+    mesa = _mesa('Clasico', 1)
+    inicial = mesa.snapshot()
+    mesa.iniciar_diario()
+    solitario = crear_solitario('Clasico', mesa)
+    solitario.jugar([(MAZO, 0)])
+    mesa.confirmar_jugada()
+    mesa.restore(inicial)
+    assert not mesa.deshacer()
+
+
+def _invalidos(snapshot):
+    """Genera snapshots inválidos para la mesa de snapshot."""
+    yield snapshot[:-1]
+    yield snapshot + b'\x00'
+    yield snapshot[:3]
+    yield b''
+    yield bytes((snapshot[0] + 1,)) + snapshot[1:]
+    # Un código de carta fuera de rango en la última pila no vacía.
+    i = len(snapshot) - 1
+    while snapshot[i] == 0:
+        i -= 1
+    yield snapshot[:i] + bytes((CANT_CODIGOS,)) + snapshot[i + 1:]
+    # Un largo de más en la primera pila: el resto queda corrido.
+    yield snapshot[:3] + bytes((snapshot[3] + 1,)) + snapshot[4:]
+
+
+@pytest.mark.parametrize('juego', sorted(SOLITARIOS))
+def test_restore_invalido_no_modifica_la_mesa(juego):
+    mesa = _mesa(juego, 3)
+    otra = _mesa(juego, 4, 30)
+    for datos in _invalidos(otra.snapshot()):
+        antes, huella = mesa.snapshot(), mesa.huella()
+        with pytest.raises(ValueError):
+            mesa.restore(datos)
+        assert mesa.snapshot() == antes
+        assert mesa.huella() == huella
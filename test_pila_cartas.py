@@ -0,0 +1,65 @@
+from solitario_clasico import *
+import random
+
+import pytest
+
+
+def _pila(codigos, **reglas):
+    pila = PilaCartas(**reglas)
+    pila.extender(codigos)
+    return pila
+
+
+def test_fundacion_sin_criterio_mover_recibe_solo_el_tope():
+    # Fundación A♠ 2♠ y pila del tablero ▓ 4♥ 3♠ 2♥: la corrida 3♠ 2♥ no
+    # puede subir en bloque a la fundación.
+    mesa = Mesa()
+    solitario = SolitarioClasico(mesa)
+    solitario.armar(random.Random(0))
+    fundacion = mesa.fundaciones[0]
+    origen = mesa.pilas_tablero[0]
+    fundacion.reemplazar([codificar(1, PICAS, False), codificar(2, PICAS, False)])
+    origen.reemplazar([codificar(9, TREBOLES), codificar(4, CORAZONES, False),
+                       codificar(3, PICAS, False), codificar(2, CORAZONES, False)])
+
+    assert origen.cantidad_movible() == 3
+    assert fundacion.cantidad_a_mover(origen) == 0
+    with pytest.raises(SolitarioError):
+        solitario.jugar([(PILA_TABLERO, 0), (FUNDACION, 0)])
+    assert fundacion.codigos == [codificar(1, PICAS, False), codificar(2, PICAS, False)]
+
+
+def test_fundacion_sin_criterio_mover_recibe_la_carta_del_tope():
+    fundacion = _pila([codificar(1, PICAS, False)], valor_inicial=1,
+                      criterio_apilar=criterio(palo=MISMO_PALO, orden=DESCENDENTE))
+    regla = criterio(palo=DISTINTO_COLOR, orden=ASCENDENTE)
+    origen = _pila([codificar(3, CORAZONES, False), codificar(2, PICAS, False)],
+                   criterio_apilar=regla, criterio_mover=regla)
+
+    assert fundacion.cantidad_a_mover(origen) == 1
+    fundacion.mover(origen)
+    assert fundacion.codigos == [codificar(1, PICAS, False), codificar(2, PICAS, False)]
+    assert origen.codigos == [codificar(3, CORAZONES, False)]
+
+
+def test_pila_con_criterio_mover_recibe_bloques():
+    regla = criterio(palo=DISTINTO_COLOR, orden=ASCENDENTE)
+    destino = _pila([codificar(5, PICAS, False)], criterio_apilar=regla, criterio_mover=regla)
+    origen = _pila([codificar(4, CORAZONES, False), codificar(3, PICAS, False)],
+                   criterio_apilar=regla, criterio_mover=regla)
+
+    assert destino.cantidad_a_mover(origen) == 2
+    destino.mover(origen)
+    assert len(destino.codigos) == 3 and origen.es_vacia()
+
+
+def test_repartir_con_boca_arriba_de_otro_largo():
+    mazo = _pila([codificar(valor, PICAS) for valor in range(1, 6)])
+    pila = PilaCartas()
+    with pytest.raises(SolitarioError):
+        pila.repartir(mazo, 5, boca_arriba=[True, False])
+    assert len(mazo.codigos) == 5 and pila.es_vacia()
+
+    pila.repartir(mazo, 2, boca_arriba=[True, False])
+    assert pila.codigos == [codificar(5, PICAS, False), codificar(4, PICAS)]
+    assert len(mazo.codigos) == 3
@@ -0,0 +1,30 @@
+from resolver_clasico import *
+
+
+def test_las_soluciones_se_pueden_jugar_en_una_mesa_nueva(fundacion_valida):
+    ganables = 0
+    for semilla in range(40):
+        veredicto, jugadas, _ = resolver_semilla(semilla, limite=1000)
+        if veredicto != GANABLE:
+            assert jugadas is None
+            continue
+        ganables += 1
+
+        random.seed(semilla)
+        mesa = Mesa()
+        solitario = SolitarioClasico(mesa)
+        solitario.armar()
+        for jugada in jugadas:
+            solitario.jugar(jugada)
+            assert all(fundacion_valida(fundacion) for fundacion in mesa.fundaciones)
+        assert solitario.termino()
+    assert ganables
+
+
+def test_imposible_solo_sin_podar():
+    # La semilla 17 agota la búsqueda sin ganar, pero con la poda se
+    # descartaron jugadas: no alcanza para decir que es imposible.
+    veredicto, jugadas, _ = resolver_semilla(17, limite=20000)
+    assert (veredicto, jugadas) == (INDETERMINADO, None)
+    veredicto, jugadas, _ = resolver_semilla(17, limite=20000, podar=False)
+    assert (veredicto, jugadas) == (IMPOSIBLE, None)
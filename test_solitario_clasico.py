@@ -0,0 +1,25 @@
+from solitario_clasico import *
+import random
+
+
+def test_a_la_fundacion_sube_solo_la_carta_del_tope(fundacion_valida):
+    for semilla in range(30):
+        azar = random.Random(semilla)
+        mesa = Mesa()
+        solitario = SolitarioClasico(mesa)
+        solitario.armar(azar)
+        for _ in range(150):
+            jugadas = solitario.jugadas_validas()
+            if not jugadas:
+                break
+            for jugada in jugadas:
+                if jugada[0][0] != PILA_TABLERO or jugada[-1][0] != FUNDACION:
+                    continue
+                copia = mesa.clonar()
+                fundacion = copia.fundaciones[jugada[1][1]]
+                antes = len(fundacion.codigos)
+                SolitarioClasico(copia).jugar(jugada)
+                assert len(fundacion.codigos) == antes + 1
+                assert fundacion_valida(fundacion)
+            solitario.jugar(azar.choice(jugadas))
+            assert all(fundacion_valida(fundacion) for fundacion in mesa.fundaciones)